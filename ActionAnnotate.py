@@ -28,6 +28,7 @@ from dspbp.Blueprint import Blueprint
 from dspbp.Enums import DysonSphereItem as dsi, Recipe
 from dspbp.Utils import maybeDysonSphereItem, maybeRecipe
 from dspbp.Recipes import ItemProduction, RECIPE_MAP, Machine
+from dspbp import Transpose
 from dspbp.Assess import Assessment, derive_destination_folder
 import dspbp.Recipes as Recipes
 from dspbp.BlueprintData import BlueprintBuilding
@@ -70,11 +71,10 @@ ICON_LAYOUT_MAP = {
 class ActionAnnotate(BaseAction):
 	def run(self):
 		for filename, bp in self.blueprints(self._args.inputs):
-			original_string = bp.serialize()
-
 			if self._args.substitute:
 				source_recipe, _, target_recipe = self._args.substitute.partition(':')
-				print(f'{source_recipe} --> {target_recipe}')
+				if self._args.verbose:
+					print(f'{source_recipe} --> {target_recipe}')
 				if not source_recipe or not target_recipe:
 					raise ValueError('Substitution must be in the format recipe1:recipe2')
 				try:
@@ -89,46 +89,9 @@ class ActionAnnotate(BaseAction):
 					# Add error print out
 					raise
 
-				source_recipe_details = RECIPE_MAP[source_recipe]
-				target_recipe_details = RECIPE_MAP[target_recipe]
-				ingredient_map = {}
-				for source_output, target_output in zip(source_recipe_details.outputs, target_recipe_details.outputs):
-					ingredient_map[source_output] = target_output
-				for source_input, target_input in zip(source_recipe_details.inputs, target_recipe_details.inputs):
-					ingredient_map[source_input] = target_input
-				print(ingredient_map)
-
-				decoded_data = bp.decoded_data
-
-				for index, building in enumerate(decoded_data.buildings):
-					item_type = maybeDysonSphereItem(building.data.item_id)
-					if item_type == dsi.PlanetaryLogisticsStation:
-						pass
-					if building.data.recipe_id == source_recipe.value:
-						building._fields = building.data._replace(recipe_id=target_recipe.value)
-					if building.data.filter_id in ingredient_map:
-						building._fields = building.data._replace(filter_id=ingredient_map[building.data.filter_id])
-					if item_type in [dsi.PlanetaryLogisticsStation, dsi.InterstellarLogisticsStation]:
-						for storage_ix, storage in enumerate(building.parameters.storage):
-							if not storage:
-								continue
-							# storage_item = maybeDysonSphereItem(storage[])
-							if storage['item_id'] in ingredient_map:
-								print('replaceing', ingredient_map[storage['item_id']])
-								# storage['item_id'] = ingredient_map[storage['item_id']]
-								building.parameters.set_storage(storage_ix,
-									'item_id', ingredient_map[storage['item_id']].value)
-								print(f'updated {storage_ix}: {building.parameters.storage}')
-
-						print(building.parameters._raw_parameters)
-					if not hasattr(building.parameters, '_TYPE'):
-						pass
-					elif building.parameters._TYPE == 'conveyor' and building.parameters.parameters:
-						print(building.parameters.parameters.memo_icon, building.parameters.parameters.memo_number)
-						if building.parameters.parameters.memo_icon in ingredient_map:
-							building.parameters.parameters.memo_icon = ingredient_map[building.parameters.memo_icon]
-
-				bp._data = decoded_data.serialize()
+				changed = Transpose.transpose(bp.decoded_data, source_recipe, target_recipe)
+				if self._args.verbose:
+					print(f'Substituted {changed} recipes and items: {Transpose.ingredient_map(source_recipe, target_recipe)}')
 
 			assessment = Assessment(bp)
 			tech_level = assessment.tech_level
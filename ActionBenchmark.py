@@ -0,0 +1,123 @@
+#	dspbptk - Dyson Sphere Program Blueprint Toolkit
+#	Copyright (C) 2024 Alan Ray
+#
+#	This file is part of dspbptk.
+#
+#	dspbptk is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	dspbptk is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import os
+import time
+
+import numpy
+
+from BaseAction import BaseAction
+from FriendlyArgumentParser import baseint_unit
+from dspbp.Blueprint import Blueprint
+from dspbp.BlueprintData import BlueprintData, BlueprintArea, BlueprintBuilding
+from dspbp.Enums import DysonSphereItem
+from dspbp.MD5 import DysonSphereMD5
+from dspbp.Recipes import ItemProduction, RECIPE_MAP, RECIPE_MATRIX
+
+def _best_time(function, repeat):
+	best = None
+	for _ in range(repeat):
+		start = time.perf_counter()
+		function()
+		elapsed = time.perf_counter() - start
+		if best is None or elapsed < best:
+			best = elapsed
+	return best
+
+class ActionBenchmark(BaseAction):
+	SUITES = [ 'md5', 'parse', 'production' ]
+
+	def run(self):
+		for suite in self._args.suites or self.SUITES:
+			getattr(self, f'_benchmark_{suite}')()
+
+	def _benchmark_md5(self):
+		data = os.urandom(self._args.size)
+		print(f'MD5 throughput ({len(data)} bytes, best of {self._args.repeat}):')
+		for variant in DysonSphereMD5.Variant:
+			elapsed = _best_time(lambda: DysonSphereMD5(variant).update(data).digest(), self._args.repeat)
+			print(f'    {variant.name:10} {len(data) / elapsed / 1e6:8.2f} MB/s')
+
+		# Batched hashing, e.g. when validating a library of blueprints
+		messages = [ data[offset : offset + 16384] for offset in range(0, len(data), 16384) ]
+		print(f'MD5 batch throughput ({len(messages)} messages, best of {self._args.repeat}):')
+		for variant in DysonSphereMD5.Variant:
+			elapsed = _best_time(lambda: DysonSphereMD5.digest_many(messages, variant), self._args.repeat)
+			print(f'    {variant.name:10} {len(data) / elapsed / 1e6:8.2f} MB/s')
+
+	@staticmethod
+	def _walk_buildings(data, unpack):
+		building_struct = BlueprintBuilding._BLUEPRINT_BUILDING
+		header = unpack(BlueprintData._HEADER, data, 0)
+		offset = BlueprintData._HEADER.size + (header.area_count * BlueprintArea._BLUEPRINT_AREA.size)
+		building_count = unpack(BlueprintData._BUILDING_HEADER, data, offset).building_count
+		offset += BlueprintData._BUILDING_HEADER.size
+		for _ in range(building_count):
+			fields = unpack(building_struct, data, offset)
+			offset += building_struct.size + (4 * fields.parameter_count)
+		return building_count
+
+	def _benchmark_parse(self):
+		if self._args.input is None:
+			print('Parse benchmark skipped (no blueprint given, use --input).')
+			return
+		data = Blueprint.read_from_file(self._args.input, lazy = True)._data
+		view = memoryview(data)
+		building_count = self._walk_buildings(view, lambda named_struct, data, offset: named_struct.unpack_from(data, offset))
+
+		print(f'Per-building parse cost ({building_count} buildings, best of {self._args.repeat}):')
+		runs = [
+			# What NamedStruct.unpack_head used to do: slice a copy for every struct
+			('slice', lambda: self._walk_buildings(data, lambda named_struct, data, offset: named_struct.unpack(data[offset : offset + named_struct.size]))),
+			('unpack_from', lambda: self._walk_buildings(view, lambda named_struct, data, offset: named_struct.unpack_from(data, offset))),
+			('deserialize', lambda: BlueprintData.deserialize(data)),
+		]
+		for name, function in runs:
+			elapsed = _best_time(function, self._args.repeat)
+			print(f'    {name:12} {elapsed / building_count * 1e6:8.3f} us/building')
+
+	def _benchmark_production(self):
+		# Every blueprint uses every recipe once, in assemblers
+		blueprint_count = 1000
+		groups = [ ((DysonSphereItem.AssemblingMachineMkII, recipe), 3) for recipe in RECIPE_MAP ]
+
+		def per_group():
+			for _ in range(blueprint_count):
+				inputs = ItemProduction()
+				outputs = ItemProduction()
+				for ((machine, recipe), count) in groups:
+					inputs -= ItemProduction(RECIPE_MAP[recipe].calculate_inputs({ machine : count }, DysonSphereItem.ProliferatorMkIII))
+					outputs += ItemProduction(RECIPE_MAP[recipe].calculate_outputs({ machine : count }, DysonSphereItem.ProliferatorMkIII))
+
+		def batched():
+			weights = [ RECIPE_MATRIX.weights(groups, DysonSphereItem.ProliferatorMkIII) for _ in range(blueprint_count) ]
+			RECIPE_MATRIX.rates(numpy.stack([ input_weights for (input_weights, _) in weights ]), numpy.stack([ output_weights for (_, output_weights) in weights ]))
+
+		print(f'Production rates ({blueprint_count} blueprints of {len(groups)} recipe groups, best of {self._args.repeat}):')
+		for name, function in [ ('per-group', per_group), ('matrix', batched) ]:
+			elapsed = _best_time(function, self._args.repeat)
+			print(f'    {name:12} {elapsed / blueprint_count * 1e6:8.1f} us/blueprint')
+
+	@classmethod
+	def register(cls, multicommand):
+		def genparser(parser):
+			parser.add_argument("-v", "--verbose", action = "count", default = 0, help = "Increase verbosity.")
+			parser.add_argument("-s", "--size", metavar = "bytes", type = baseint_unit, default = "1Mi", help = "Amount of data to hash per run. Defaults to %(default)s.")
+			parser.add_argument("-i", "--input", metavar = "filename", help = "Blueprint file to use for the parse benchmark.")
+			parser.add_argument("-r", "--repeat", metavar = "count", type = int, default = 3, help = "Number of runs; the best one is reported. Defaults to %(default)s.")
+			parser.add_argument("suites", nargs = "*", choices = cls.SUITES, help = "Benchmark suite(s) to run. Defaults to all suites.")
+		multicommand.register("benchmark", "Measure the performance of hashing and (de)serialization", genparser, action = cls)
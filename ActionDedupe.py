@@ -0,0 +1,53 @@
+#	dspbptk - Dyson Sphere Program Blueprint Toolkit
+#	Copyright (C) 2024 Alan Ray
+#
+#	This file is part of dspbptk.
+#
+#	dspbptk is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	dspbptk is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import collections
+import json
+
+from BaseAction import BaseAction, _input_to_path
+import envshim
+
+from dspbp.Fingerprint import fingerprint
+
+class ActionDedupe(BaseAction):
+	def run(self):
+		inputs = [_input_to_path(input) for input in self._args.inputs] or [envshim.ENV['root']]
+		groups = collections.defaultdict(list)
+		for filename, bp in self.blueprints(inputs, lazy = True):
+			# Columnar decode, no building objects are needed
+			layout = fingerprint(bp.decode(columnar = True))
+			groups[layout].append(filename)
+			if self._args.verbose > 0:
+				print(f'{layout[:16]}  {filename}')
+
+		duplicates = { layout: filenames for layout, filenames in groups.items() if len(filenames) > 1 }
+		if self._args.json:
+			print(json.dumps(duplicates, indent = 4, sort_keys = True))
+			return
+		print(f'{sum(len(filenames) for filenames in groups.values())} blueprints, {len(groups)} distinct layouts')
+		if duplicates:
+			print(f'\nIdentical layouts ({len(duplicates)}):')
+			for layout, filenames in sorted(duplicates.items(), key = lambda entry: entry[1]):
+				print(f'    {layout[:16]}: {', '.join(filenames)}')
+
+	@classmethod
+	def register(cls, multicommand):
+		def genparser(parser):
+			cls._genparser(parser, is_folder_search=True)
+			parser.add_argument('--json', action='store_true', help='Print the groups of identical layouts as JSON, keyed by fingerprint.')
+		multicommand.register("dedupe", "Find blueprints with identical layouts, regardless of descriptions, building order or position", genparser, action = cls)
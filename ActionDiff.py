@@ -0,0 +1,82 @@
+#	dspbptk - Dyson Sphere Program Blueprint Toolkit
+#	Copyright (C) 2024 Alan Ray
+#
+#	This file is part of dspbptk.
+#
+#	dspbptk is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	dspbptk is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import json
+import os
+
+from BaseAction import BaseAction
+from dspbp.Blueprint import Blueprint
+from dspbp.Diff import BlueprintDiff, MATCH_KEYS
+
+class ActionDiff(BaseAction):
+	def _read(self, filename):
+		bp = Blueprint.read_from_file(filename, validate_hash = not self._args.ignore_corrupt, lazy = True)
+		# Columnar decode; the diff works on the building table
+		return bp.decode(columnar = True)
+
+	def _diff(self, old_filename, new_filename):
+		return BlueprintDiff(self._read(old_filename), self._read(new_filename), match = self._args.match).to_dict()
+
+	def _diff_libraries(self):
+		old_files = { os.path.relpath(filename, self._args.old): filename for filename in self.find_blueprints([ self._args.old ]) }
+		new_files = { os.path.relpath(filename, self._args.new): filename for filename in self.find_blueprints([ self._args.new ]) }
+		result = { }
+		for name in sorted(set(old_files) | set(new_files)):
+			if name not in new_files:
+				result[name] = { "status": "removed" }
+			elif name not in old_files:
+				result[name] = { "status": "added" }
+			else:
+				if self._args.verbose > 0:
+					print(f'Comparing {name}...')
+				diff = self._diff(old_files[name], new_files[name])
+				summary = diff["summary"]
+				diff["status"] = "modified" if (summary["added"] or summary["removed"] or summary["modified"]) else "unchanged"
+				if (diff["status"] == "unchanged") or self._args.summary_only:
+					diff = { "status": diff["status"], "summary": summary }
+				result[name] = diff
+		return result
+
+	def run(self):
+		if os.path.isdir(self._args.old) and os.path.isdir(self._args.new):
+			result = self._diff_libraries()
+		elif os.path.isdir(self._args.old) or os.path.isdir(self._args.new):
+			print("Either compare two blueprint files or two blueprint directories.")
+			return 1
+		else:
+			result = self._diff(self._args.old, self._args.new)
+			if self._args.summary_only:
+				result = { "summary": result["summary"] }
+
+		if self._args.pretty_print:
+			print(json.dumps(result, indent = 4, sort_keys = True))
+		else:
+			print(json.dumps(result))
+
+	@classmethod
+	def register(cls, multicommand):
+		def genparser(parser):
+			parser.add_argument("--ignore-corrupt", action = "store_true", help = "Do not validate the checksum when reading the blueprint file.")
+			parser.add_argument("-v", "--verbose", action = "count", default = 0, help = "Increase verbosity.")
+			parser.add_argument("--no-recurse", dest = 'should_recurse', action = "store_false", help = "Do not recurse into subdirectories when comparing directories.")
+			parser.add_argument("-m", "--match", choices = list(MATCH_KEYS), default = "position", help = "How buildings that are not identical are paired up to be reported as modified. Can be one of %(choices)s, defaults to %(default)s.")
+			parser.add_argument("-s", "--summary-only", action = "store_true", help = "Only report the number of unchanged, added, removed and modified buildings.")
+			parser.add_argument("-p", "--pretty-print", action = "store_true", help = "Pretty-print the JSON output.")
+			parser.add_argument("old", help = "Original blueprint file or directory")
+			parser.add_argument("new", help = "Changed blueprint file or directory")
+		multicommand.register("diff", "Compare the buildings of two blueprints (or two directories of blueprints) and report the differences as JSON", genparser, action = cls)
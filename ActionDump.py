@@ -24,24 +24,27 @@ from BaseAction import BaseAction
 from dspbp.Blueprint import Blueprint
 from dspbp.Enums import DysonSphereItem, Recipe
 from dspbp.BlueprintData import ParameterType
+from dspbp.Utils import maybeDysonSphereItem, maybeRecipe
 
 class ActionDump(BaseAction):
 	def run(self):
-		for filename, bp in self.blueprints(self._args.inputs):
+		for filename, bp in self.blueprints(self._args.inputs, lazy = True):
 			if len(self._args.inputs) > 1:
 				print(f"{filename}:")
-			bpd = bp.decoded_data
+			if self._args.stream:
+				# Count while decompressing; the decoded payload is never held in memory as a whole
+				building_counter = collections.Counter((building.data.item_id, building.data.recipe_id) for building in bp.iter_buildings())
+			else:
+				# Lazily decoded, so the counts are read straight from the payload without creating building objects
+				building_counter = bp.decoded_data.item_recipe_counts
+			building_count = building_counter.total()
 
-			building_counter = collections.Counter()
 			item_storage_counter = collections.Counter()
-			for building in bpd.buildings:
-				# IMPROVE: Why are we checking for conveyer sentinel when we're looking for storage? I suspect
-				# this was an asleep at the switch mistake; revisit when there's a chance.
-				# if building.parameters.SENTINEL == ParameterType.CONVEYOR and building.parameters.parameters:
-				# 	item_storage_counter[(building.data.item_id, building.parameters.parameters.memo_icon)] += 1
-
-
-				building_counter[(building.data.item_id, building.data.recipe_id)] += 1
+			# IMPROVE: Why are we checking for conveyer sentinel when we're looking for storage? I suspect
+			# this was an asleep at the switch mistake; revisit when there's a chance.
+			# for building in bp.decoded_data.buildings:
+			# 	if building.parameters.SENTINEL == ParameterType.CONVEYOR and building.parameters.parameters:
+			# 		item_storage_counter[(building.data.item_id, building.parameters.parameters.memo_icon)] += 1
 
 			if bp.short_desc != "":
 				print("Text          : %s" % (bp.short_desc))
@@ -49,14 +52,12 @@ class ActionDump(BaseAction):
 				print("Description   : %s\n" % (bp.long_desc))
 			if self._args.verbose >= 1:
 				print("Game version  : %s" % (bp.game_version))
-			print("Building count: %d" % (len(bpd.buildings)))
+			print("Building count: %d" % (building_count))
 			for ((item_id, recipe_id), count) in building_counter.most_common():
-				try:
-					item = DysonSphereItem(item_id)
-					item_name = item.name
-				except ValueError:
-					item_name = f"[{item_id}]"
-				print(f'{count:5} {item_name} {(Recipe(recipe_id).name if recipe_id in Recipe else 'Unknown'):20} ({recipe_id:3})')
+				item = maybeDysonSphereItem(item_id)
+				item_name = item.name if item else f"[{item_id}]"
+				recipe = maybeRecipe(recipe_id)
+				print(f'{count:5} {item_name} {(recipe.name if recipe else 'Unknown'):20} ({recipe_id:3})')
 
 			if item_storage_counter:
 				print(f'\nStored items:')
@@ -71,4 +72,5 @@ class ActionDump(BaseAction):
 	def register(cls, multicommand):
 		def genparser(parser):
 			cls._genparser(parser, is_folder_search=True)
+			parser.add_argument("--stream", action = "store_true", help = "Count buildings while decompressing, without holding the whole blueprint in memory.")
 		multicommand.register("dump", "Dump some information about blueprint(s)", genparser, action = cls)
@@ -21,23 +21,136 @@
 import os
 from BaseAction import BaseAction
 from dspbp.Blueprint import Blueprint
+from dspbp.Enums import DysonSphereItem, Recipe
+from dspbp import Tile, Transform, Transpose, Upgrade
 
 class ActionEdit(BaseAction):
 	def run(self):
-		if (not self._args.force) and os.path.exists(self._args.outfile):
+		if (not self._args.force) and (self._args.tier_book is None) and (self._args.transpose_siblings is None) and os.path.exists(self._args.outfile):
 			print("Refusing to overwrite: %s" % (self._args.outfile))
 			return 1
 
-		bp = Blueprint.read_from_file(self._args.infile, validate_hash = not self._args.ignore_corrupt)
+		# Unless the buildings are transformed, only header fields are edited and the payload does not need to be decoded
+		bp = Blueprint.read_from_file(self._args.infile, validate_hash = not self._args.ignore_corrupt, lazy = True)
 		if self._args.short_desc is not None:
 			bp.short_desc = self._args.short_desc
+		if self._transforms_requested():
+			try:
+				self._transform(bp)
+			except ValueError as e:
+				print(f'Cannot transform {self._args.infile}: {e}')
+				return 1
+		if self._args.tile is not None:
+			try:
+				bp = self._tile(bp)
+			except ValueError as e:
+				print(f'Cannot tile {self._args.infile}: {e}')
+				return 1
+		if self._args.tier_book is not None:
+			book = Upgrade.template_book(bp, self._args.tier_book)
+			return self._write_variants([ (f'Mk{Upgrade.ROMAN_TIERS[tier]}', variant) for (tier, variant) in enumerate(book) ])
+		if self._args.transpose_siblings is not None:
+			variants = Transpose.transpose_siblings(bp, self._args.transpose_siblings)
+			for (recipe, variant) in variants:
+				short_desc = bp.short_desc.replace(self._args.transpose_siblings.name, recipe.name)
+				variant.short_desc = short_desc if (short_desc != bp.short_desc) else f'{bp.short_desc} {recipe.name}'
+			return self._write_variants([ (recipe.name, variant) for (recipe, variant) in variants ])
 		bp.write_to_file(self._args.outfile)
 
+	def _write_variants(self, variants):
+		(base, extension) = os.path.splitext(self._args.outfile)
+		filenames = [ f'{base} {suffix}{extension}' for (suffix, _) in variants ]
+		if not self._args.force:
+			for filename in filenames:
+				if os.path.exists(filename):
+					print("Refusing to overwrite: %s" % (filename))
+					return 1
+		for (filename, (_, variant)) in zip(filenames, variants):
+			variant.write_to_file(filename)
+			if self._args.verbose >= 1:
+				print(f'{filename}: {variant.short_desc}')
+
+	def _tile(self, bp):
+		(columns, rows) = self._args.tile
+		(step_x, step_y) = self._args.tile_step if (self._args.tile_step is not None) else (None, None)
+		tiled = Tile.tile(bp.decode(columnar = True), columns, rows, step_x, step_y)
+		if self._args.verbose >= 1:
+			print(f'Tiled {columns}x{rows} copies, {tiled.building_count} buildings')
+		return bp.copy_with_data(tiled.serialize())
+
+	def _transforms_requested(self):
+		return self._args.center or (self._args.center_on is not None) or (self._args.rotate is not None) or (self._args.mirror is not None) or (self._args.translate is not None) or self._args.upgrade
+
+	def _transform(self, bp):
+		# Decode columnar, the transforms work on whole columns
+		data = bp.decode(columnar = True)
+		if self._args.center:
+			Transform.center_on_poi(data)
+		if self._args.center_on is not None:
+			Transform.center_on_poi(data, [ self._args.center_on ])
+		if self._args.rotate is not None:
+			Transform.rotate(data, self._args.rotate // 90)
+		if self._args.mirror is not None:
+			Transform.mirror(data, self._args.mirror)
+		if self._args.translate is not None:
+			Transform.translate(data, *self._args.translate)
+		for (building_class, tier) in self._args.upgrade:
+			if tier[0] in "+-":
+				count = Upgrade.shift_tier(data, building_class, int(tier))
+			else:
+				count = Upgrade.set_tier(data, building_class, int(tier))
+			if self._args.verbose >= 1:
+				print(f'Changed tier of {count} {building_class} buildings')
+
 	@classmethod
 	def register(cls, multicommand):
+		def offset(text):
+			(dx, dy) = text.split(",")
+			return (int(dx), int(dy))
+
+		def grid(text):
+			(columns, rows) = text.split("x")
+			return (int(columns), int(rows))
+
+		def upgrade(text):
+			(building_class, tier) = text.split(":")
+			if building_class not in Upgrade.BUILDING_CLASSES:
+				raise ValueError(f'Unknown building class {building_class}')
+			int(tier)
+			return (building_class, tier)
+
+		def building_classes(text):
+			classes = text.split(",")
+			for building_class in classes:
+				if building_class not in Upgrade.BUILDING_CLASSES:
+					raise ValueError(f'Unknown building class {building_class}')
+			return classes
+
+		def item(name):
+			try:
+				return DysonSphereItem[name]
+			except KeyError:
+				raise ValueError(f'Unknown item {name}')
+
+		def recipe(name):
+			try:
+				return Recipe[name]
+			except KeyError:
+				raise ValueError(f'Unknown recipe {name}')
+
 		def genparser(parser):
 			parser.add_argument("-f", "--force", action = "store_true", help = "Overwrite output file if it exists.")
 			parser.add_argument("--short-desc", metavar = "description", help = "Set short description to this value.")
+			parser.add_argument("--center", action = "store_true", help = "Center the blueprint on its first interstellar or planetary logistics station.")
+			parser.add_argument("--center-on", metavar = "item", type = item, help = "Center the blueprint on the first building of this item, e.g. TeslaTower.")
+			parser.add_argument("--rotate", metavar = "degrees", type = int, choices = [ 90, 180, 270 ], help = "Rotate the blueprint clockwise. Can be one of %(choices)s.")
+			parser.add_argument("--mirror", choices = [ "x", "y" ], help = "Mirror the blueprint along this axis. Can be one of %(choices)s.")
+			parser.add_argument("--translate", metavar = "dx,dy", type = offset, help = "Move the buildings by whole grid units relative to the anchor. Transforms apply in the order center, rotate, mirror, translate.")
+			parser.add_argument("--tile", metavar = "columns x rows", type = grid, help = "Repeat the blueprint in a grid of copies, e.g. 8x1 for a row of eight. Tiling is done after all transforms.")
+			parser.add_argument("--tile-step", metavar = "dx,dy", type = offset, help = "Distance between tiled copies in grid units. Defaults to the size of the blueprint area, which holds the footprints of all buildings.")
+			parser.add_argument("--upgrade", metavar = "class:tier", type = upgrade, action = "append", default = [ ], help = f'Set all buildings of a class to a tier (e.g. belt:3), or shift their tier (e.g. sorter:-1). Classes are {", ".join(Upgrade.BUILDING_CLASSES)}. Can be given multiple times.')
+			parser.add_argument("--tier-book", metavar = "class[,class]", type = building_classes, help = "Instead of outfile, write one blueprint per tier (\"outfile MkI\", \"outfile MkII\", ...) with all buildings of the given classes set to that tier.")
+			parser.add_argument("--transpose-siblings", metavar = "recipe", type = recipe, help = "Instead of outfile, write one blueprint per sibling recipe of this recipe (\"outfile CopperIngot\", ... for IronIngot) with recipes, filters, station storage and belt memos transposed.")
 			parser.add_argument("--ignore-corrupt", action = "store_true", help = "Do not validate the checksum when reading the blueprint file.")
 			parser.add_argument("-v", "--verbose", action = "count", default = 0, help = "Increase verbosity.")
 			parser.add_argument("infile", help = "Input blueprint text file")
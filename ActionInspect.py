@@ -81,23 +81,20 @@ class ActionInspect(BaseAction):
 			known_transfers = []
 			max_outputs = ItemProduction()
 
-			unique_buildings = set()
-			unique_recipes = set()
-
-			for building in bpd.buildings:
-				item_type = maybeDysonSphereItem(building.data.item_id) or f'[{building.data.item_id}]'
-				if building.data.recipe_id:
-					building_counter[(building.data.item_id, building.data.recipe_id)] += 1
-					unique_recipes.add(building.data.recipe_id)
-				unique_buildings.add(building.data.item_id)
-
-				if item_type in [dsi.PlanetaryLogisticsStation, dsi.InterstellarLogisticsStation]:
-					for storage in building.parameters.storage:
-						if not storage:
-							continue
-						known_transfers.append(maybeDysonSphereItem(storage['item_id'] or f'u{storage['item_id']}'))
-				elif item_type == dsi.LogisticsDistributor:
+			for ((item_id, recipe_id), count) in bpd.item_recipe_counts.items():
+				if recipe_id:
+					building_counter[(item_id, recipe_id)] += count
+			unique_buildings = set(bpd.indices_by('item_id'))
+			unique_recipes = set(recipe_id for recipe_id in bpd.indices_by('recipe_id') if recipe_id)
+
+			for building in bpd.buildings_with('item_id', dsi.PlanetaryLogisticsStation, dsi.InterstellarLogisticsStation, dsi.LogisticsDistributor):
+				if building.item == dsi.LogisticsDistributor:
 					known_transfers.append(maybeDysonSphereItem(building.data.filter_id or f'u{building.data.filter_id}'))
+					continue
+				for storage in building.parameters.storage:
+					if not storage:
+						continue
+					known_transfers.append(maybeDysonSphereItem(storage['item_id'] or f'u{storage['item_id']}'))
 
 			proliferate = dsi.ProliferatorMkIII if dsi.ProliferatorMkIII in known_transfers \
 				else dsi.ProliferatorMkII if dsi.ProliferatorMkII in known_transfers \
@@ -130,10 +127,10 @@ class ActionInspect(BaseAction):
 
 			net_outputs = outputs - inputs
 			if not self._args.full:
-				for item in (outputs - inputs)._items:
-					if item in inputs._items and item in outputs._items:
-						del net_outputs._items[item]
-						del max_outputs._items[item]
+				for (item, _) in net_outputs.items():
+					if item in inputs and item in outputs:
+						del net_outputs[item]
+						del max_outputs[item]
 			print('Input/output summary')
 			print(net_outputs)
 			primary_output_id, primary_output_amount = net_outputs.primary_output
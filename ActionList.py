@@ -0,0 +1,55 @@
+#	dspbptk - Dyson Sphere Program Blueprint Toolkit
+#	Copyright (C) 2024 Alan Ray
+#
+#	This file is part of dspbptk.
+#
+#	dspbptk is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	dspbptk is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import collections
+import os
+
+from BaseAction import BaseAction, _input_to_path
+import envshim
+
+from dspbp.Blueprint import Blueprint
+
+class ActionList(BaseAction):
+	SORT_KEYS = {
+		'name' : lambda entry: (entry[1].short_desc.lower(), entry[0]),
+		'time' : lambda entry: (entry[1].timestamp, entry[0]),
+		'file' : lambda entry: entry[0],
+	}
+
+	def run(self):
+		inputs = [_input_to_path(input) for input in self._args.inputs] or [envshim.ENV['root']]
+		# Only the headers are needed, so never read the (potentially huge) payloads
+		entries = [(filename, Blueprint.peek_header(filename)) for filename in self.find_blueprints(inputs)]
+		entries.sort(key = self.SORT_KEYS[self._args.sort])
+
+		for filename, header in entries:
+			print(f'{header.timestamp.strftime("%Y-%m-%d %H:%M")}  {header.short_desc:50} {filename if self._args.verbose else os.path.basename(filename)}')
+
+		# Annotated blueprints are named after their short description, so duplicates will collide
+		name_counter = collections.Counter(header.short_desc for _, header in entries)
+		conflicts = [name for name, count in name_counter.items() if count > 1]
+		if conflicts:
+			print(f'\nConflicting short descriptions ({len(conflicts)}):')
+			for name in sorted(conflicts):
+				print(f'    {name}: {', '.join(filename for filename, header in entries if header.short_desc == name)}')
+
+	@classmethod
+	def register(cls, multicommand):
+		def genparser(parser):
+			cls._genparser(parser, is_folder_search=True)
+			parser.add_argument('-s', '--sort', choices=sorted(cls.SORT_KEYS), default='name', help='Sort order of the listing. Defaults to %(default)s.')
+		multicommand.register("list", "List blueprints by their descriptions without loading them", genparser, action = cls)
@@ -34,23 +34,21 @@ class ActionSearchUnknownIds(BaseAction):
 		for blueprint_file in input_files:
 			if blueprint_file == '_intro_':
 				continue
-			bp = Blueprint.read_from_file(blueprint_file, validate_hash = not self._args.ignore_corrupt)
-			bpd = bp.decoded_data
+			# Buildings are streamed while decompressing, so even huge blueprints are never held in memory
+			bp = Blueprint.read_from_file(blueprint_file, validate_hash = not self._args.ignore_corrupt, lazy = True)
 
 			building_counter = collections.Counter()
-			for building in bpd.buildings:
+			for building in bp.iter_buildings():
 				building_counter[building.data.item_id] += 1
 				if building.data.recipe_id:
-					if not maybeRecipe(building.data.recipe_id):
+					if maybeRecipe(building.data.recipe_id) is None:
 						name = f'{building.data.recipe_id} (recipe)'
 						if name not in new_ids:
 							new_ids[name] = set([])
 						new_ids[name].add(blueprint_file)
 
 			for (item_id, count) in building_counter.most_common():
-				try:
-					item = DysonSphereItem(item_id)
-				except ValueError:
+				if maybeDysonSphereItem(item_id) is None:
 					if item_id not in new_ids:
 						new_ids[item_id] = set([])
 					new_ids[item_id].add(blueprint_file)
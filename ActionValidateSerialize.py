@@ -18,7 +18,7 @@
 import os
 
 from BaseAction import BaseAction
-from dspbp.Blueprint import Blueprint
+from dspbp.Blueprint import Blueprint, InvalidHashValueException
 
 
 class ActionValidateSerialize(BaseAction):
@@ -40,15 +40,29 @@ class ActionValidateSerialize(BaseAction):
 
 		validated_count = 0
 
+		bp_strings = [ ]
 		for input_file in input_files:
-			bp = Blueprint.read_from_file(input_file, validate_hash = not self._args.ignore_corrupt)
+			with open(input_file) as f:
+				bp_strings.append(f.read())
+		if not self._args.ignore_corrupt:
+			# Hash all blueprints in one batch rather than one at a time
+			for (input_file, is_valid) in zip(input_files, Blueprint.validate_hashes(bp_strings)):
+				if not is_valid:
+					raise InvalidHashValueException(f'Blueprint has invalid hash value: {input_file}')
+
+		for (input_file, bp_string) in zip(input_files, bp_strings):
+			bp = Blueprint.from_blueprint_string(bp_string, validate_hash = False)
+			original_data = bp._data
 			bpd = bp.decoded_data
+			# Unmodified buildings would just be copied, so force every building to be packed again
+			for building in bpd.buildings:
+				building.mark_dirty()
 			serialized_data = bpd.serialize()
 
-			if bp._data == serialized_data:
+			if original_data == serialized_data:
 				validated_count += 1
 			else:
-				print(f'Blueprint did not serialize as expected: {input}')
+				print(f'Blueprint did not serialize as expected: {input_file}')
 
 		print(f'Validated {validated_count} of {len(input_files)} blueprints.')
 		if validated_count != len(input_files):
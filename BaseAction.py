@@ -19,7 +19,7 @@
 #	Johannes Bauer <JohannesBauer@gmx.de>
 import os
 
-from dspbp.Blueprint import Blueprint
+from dspbp.Blueprint import Blueprint, InvalidHashValueException
 import envshim
 
 
@@ -36,6 +36,8 @@ def _input_to_path(input):
 	return input  # Should this error?
 
 class BaseAction():
+	_HASH_BATCH_SIZE = 256
+
 	def __init__(self, cmdname, args):
 		self._cmd = cmdname
 		self._args = args
@@ -75,21 +77,36 @@ class BaseAction():
 				raise ValueError(f'Unknown input {input}')
 		return input_files
 
-	def blueprints(self, inputs):
+	def blueprints(self, inputs, lazy = False):
+		"""
+		Yields (filename, blueprint) for all blueprints found in inputs. Commands that only need header fields
+		(descriptions, icons, timestamp) should pass lazy=True to skip decoding the payload.
+		"""
 		# Capture all files so we don't grab more files as we rename them
 		blueprint_files = [filename for filename in self.find_blueprints(_input_to_path(input) for input in inputs if input and not _is_blueprint(input))]
-		for filename in blueprint_files:
-			yield filename, Blueprint.read_from_file(filename, validate_hash = not self._args.ignore_corrupt)
+		# Read files in batches so that their hashes can be validated together
+		for batch_start in range(0, len(blueprint_files), self._HASH_BATCH_SIZE):
+			filenames = blueprint_files[batch_start : batch_start + self._HASH_BATCH_SIZE]
+			bp_strings = []
+			for filename in filenames:
+				with open(filename) as f:
+					bp_strings.append(f.read())
+			if not self._args.ignore_corrupt:
+				for filename, is_valid in zip(filenames, Blueprint.validate_hashes(bp_strings)):
+					if not is_valid:
+						raise InvalidHashValueException(f'Blueprint has invalid hash value: {filename}')
+			for filename, bp_string in zip(filenames, bp_strings):
+				yield filename, Blueprint.from_blueprint_string(bp_string, validate_hash = False, lazy = lazy)
 		for input in inputs:
 			if not input or not input.startswith('BLUEPRINT:'):
 				continue
-			yield None, Blueprint.from_blueprint_string(input, validate_hash = not self._args.ignore_corrupt)
+			yield None, Blueprint.from_blueprint_string(input, validate_hash = not self._args.ignore_corrupt, lazy = lazy)
 		if not inputs:
 			try:
 				import pyperclip
 				maybe_blueprint = pyperclip.paste()
 				if _is_blueprint(maybe_blueprint):
-					yield None, Blueprint.from_blueprint_string(maybe_blueprint, validate_hash = not self._args.ignore_corrupt)
+					yield None, Blueprint.from_blueprint_string(maybe_blueprint, validate_hash = not self._args.ignore_corrupt, lazy = lazy)
 			except ImportError:
 				pass
 
@@ -20,14 +20,28 @@ import collections
 import math
 import os
 
+import numpy
+
 from .Utils import maybeDysonSphereItem, maybeRecipe
+from .BlueprintData import parse_parameters
 from .Enums import DysonSphereItem as dsi, LogisticsStationDirection, ProductCategory, ProliferationEffect
-from .Recipes import ItemProduction, RECIPE_MAP, Machine, PRODUCT_CATEGORY_MAP
+from .Recipes import ItemProduction, RECIPE_MAP, RECIPE_MATRIX, Machine, PRODUCT_CATEGORY_MAP
 
 Sector = collections.namedtuple("Sector", ['name', 'abbreviation', 'height', 'width'])
 
 class Assessment:
 	def __init__(self, blueprint):
+		self._assess(blueprint)
+		self._set_production(*RECIPE_MATRIX.rates(self._input_weights, self._output_weights))
+
+	@classmethod
+	def _without_production(cls, blueprint):
+		# Production is set afterwards by assess_all
+		assessment = cls.__new__(cls)
+		assessment._assess(blueprint)
+		return assessment
+
+	def _assess(self, blueprint):
 		self.decoded_data = blueprint.decoded_data
 		self.size_assessment = SizeAssessment(self.decoded_data)
 
@@ -54,89 +68,123 @@ class Assessment:
 		# - More accurately assessing intermediate steps and which machines should be upgraded
 		# - Determining which steps are proliferated
 		# - Validating known inputs/outputs match actual inputs / outputs
-		inputs = ItemProduction()
-		outputs = ItemProduction()
-
 		self.imports = set([])
 		self.exports = set([])
 
-		for building in self.decoded_data.buildings:
-			item_type = maybeDysonSphereItem(building.data.item_id) or f'[{building.data.item_id}]'
-			building_counter[item_type] += 1
-			if building.data.recipe_id:
-				recipe_id = maybeRecipe(building.data.recipe_id)
-				if  recipe_id:
-					building_recipe_counter[(building.data.item_id, building.data.recipe_id)] += 1
-					recipe_counter[recipe_id] += 1
-				else:
-					print(f'Unknown recipe id {building.data.recipe_id}')
-
-				# Assume we aren't mixing and matching proliferation effects for the same recipe
-				recipe_proliferation_effects[recipe_id] = building.parameters.parameters.proliferation_effect
-				# Hack until we fix parameters for Matrix labs
-				if item_type == dsi.MatrixLab:
-					recipe_proliferation_effects[recipe_id] = ProliferationEffect.Product
-
-			if item_type in [dsi.PlanetaryLogisticsStation, dsi.InterstellarLogisticsStation]:
-				for storage in building.parameters.storage:
-					if not storage:
-						continue
-					if not storage['item_id']:
-						continue
-					storage_id = maybeDysonSphereItem(storage['item_id'])
-					if not storage_id:
-						print(f'Unknown storage id {storage['item_id']}')
-						storage_id = f'u<{storage['item_id']}>'
-					if item_type == dsi.InterstellarLogisticsStation and LogisticsStationDirection.Input == storage['remote_logic']:
-						self.imports.add(storage_id)
-					elif LogisticsStationDirection.Input == storage['local_logic']:
-						self.imports.add(storage_id)
-					if item_type == dsi.InterstellarLogisticsStation and LogisticsStationDirection.Output == storage['remote_logic']:
-						self.exports.add(storage_id)
-					elif LogisticsStationDirection.Output == storage['local_logic']:
-						self.exports.add(storage_id)
-			elif item_type == dsi.LogisticsDistributor:
-				if building.data.filter_id:
-					item_id = maybeDysonSphereItem(building.data.filter_id or f'u{building.data.filter_id}')
-					if building.parameters.parameters.supply_logic == LogisticsStationDirection.Input:
-						self.imports.add(item_id)
-					elif building.parameters.parameters.supply_logic == LogisticsStationDirection.Output:
-						self.exports.add(item_id)
+		# All counts come from the lookup indexes of the decoded data rather than a scan over the buildings
+		for (item_id, indices) in self.decoded_data.indices_by('item_id').items():
+			building_counter[maybeDysonSphereItem(item_id) or f'[{item_id}]'] += len(indices)
+		for ((item_id, recipe_id), count) in self.decoded_data.item_recipe_counts.items():
+			if not recipe_id:
+				continue
+			recipe = maybeRecipe(recipe_id)
+			if recipe:
+				building_recipe_counter[(item_id, recipe_id)] += count
+				recipe_counter[recipe] += count
+			else:
+				print(f'Unknown recipe id {recipe_id}')
+		# Parameters are read from the raw parameters, so columnar data is not converted to building objects
+		item_ids = self.decoded_data.column('item_id')
+		for (recipe_id, indices) in self.decoded_data.indices_by('recipe_id').items():
+			if not recipe_id:
+				continue
+			# Assume we aren't mixing and matching proliferation effects for the same recipe
+			building_index = indices[-1]
+			# Hack until we fix parameters for Matrix labs
+			if item_ids[building_index] == dsi.MatrixLab:
+				recipe_proliferation_effects[recipe_id] = ProliferationEffect.Product
+			else:
+				recipe_proliferation_effects[recipe_id] = parse_parameters(item_ids[building_index], self.decoded_data.building_parameters(building_index)).parameters.proliferation_effect
+
+		item_indices = self.decoded_data.indices_by('item_id')
+		filter_ids = self.decoded_data.column('filter_id')
+		for item_type in [dsi.PlanetaryLogisticsStation, dsi.InterstellarLogisticsStation, dsi.LogisticsDistributor]:
+			for building_index in item_indices.get(item_type, []):
+				parameters = parse_parameters(item_type, self.decoded_data.building_parameters(building_index))
+				if item_type in [dsi.PlanetaryLogisticsStation, dsi.InterstellarLogisticsStation]:
+					for storage in parameters.storage:
+						if not storage:
+							continue
+						if not storage['item_id']:
+							continue
+						storage_id = maybeDysonSphereItem(storage['item_id'])
+						if not storage_id:
+							print(f'Unknown storage id {storage['item_id']}')
+							storage_id = f'u<{storage['item_id']}>'
+						if item_type == dsi.InterstellarLogisticsStation and LogisticsStationDirection.Input == storage['remote_logic']:
+							self.imports.add(storage_id)
+						elif LogisticsStationDirection.Input == storage['local_logic']:
+							self.imports.add(storage_id)
+						if item_type == dsi.InterstellarLogisticsStation and LogisticsStationDirection.Output == storage['remote_logic']:
+							self.exports.add(storage_id)
+						elif LogisticsStationDirection.Output == storage['local_logic']:
+							self.exports.add(storage_id)
+				elif item_type == dsi.LogisticsDistributor:
+					filter_id = filter_ids[building_index]
+					if filter_id:
+						item_id = maybeDysonSphereItem(filter_id or f'u{filter_id}')
+						if parameters.parameters.supply_logic == LogisticsStationDirection.Input:
+							self.imports.add(item_id)
+						elif parameters.parameters.supply_logic == LogisticsStationDirection.Output:
+							self.exports.add(item_id)
 
 		self.proliferate = dsi.ProliferatorMkIII if dsi.ProliferatorMkIII in self.imports \
 			else dsi.ProliferatorMkII if dsi.ProliferatorMkII in self.imports \
 			else dsi.ProliferatorMkI if dsi.ProliferatorMkI in self.imports \
 			else None
 
+		groups = []
 		for ((item_type_id, recipe_id), amount) in building_recipe_counter.most_common():
 			recipe = None if recipe_id == 0 else (maybeRecipe(recipe_id) or f'[{recipe_id} (recipe)]')
-			item_type = maybeDysonSphereItem(item_type_id) or f'[{building.data.item_id}]'
+			item_type = maybeDysonSphereItem(item_type_id) or f'[{item_type_id}]'
 			if recipe_id:
 				if recipe_id in RECIPE_MAP:
-					recipe_production = RECIPE_MAP[recipe_id]
-					inputs -= ItemProduction(recipe_production.calculate_inputs({ item_type : amount }, self.proliferate, recipe_proliferation_effects[recipe_id]))
-					outputs += ItemProduction(recipe_production.calculate_outputs({ item_type : amount }, self.proliferate, recipe_proliferation_effects[recipe_id]))
+					groups.append(((item_type, recipe_id), amount))
 				else:
 					print(f'\tRecipe {recipe.name} has no production information')
 
+		# Production rates are a product of per-recipe weights with the compiled recipe rates (see assess_all)
+		self._input_weights, self._output_weights = RECIPE_MATRIX.weights(groups, self.proliferate, recipe_proliferation_effects)
+		self._production_recipes = [recipe_id for ((_, recipe_id), _) in groups]
+
+	def _set_production(self, input_rates, output_rates):
+		input_items, output_items = RECIPE_MATRIX.touched_items(self._production_recipes)
+		inputs = ItemProduction.from_amounts(-input_rates, input_items)
+		outputs = ItemProduction.from_amounts(output_rates, output_items)
+
 		self.intermediate_inputs = {}
 		self.intermediate_outputs = {}
 		self.inputs = {}
 		self.outputs = {}
 
 		for item, amount in inputs.items():
-			if item in outputs._items.keys():
+			if item in outputs:
 				self.intermediate_inputs[item] = -amount
 			else:
 				self.inputs[item] = -amount
 		for item, amount in outputs.items():
-			if item in inputs._items.keys():
+			if item in inputs:
 				self.intermediate_outputs[item] = amount
 			else:
 				self.outputs[item] = amount
 
 		self.primary_output_id, self.primary_output_amount = ItemProduction(self.outputs).primary_output
 		self.primary_output_id = maybeDysonSphereItem(self.primary_output_id) or self.primary_output_id
+
+	@classmethod
+	def assess_all(cls, blueprints):
+		"""
+		Assesses many blueprints, computing the production rates of all of them in one matrix product.
+		"""
+		assessments = [cls._without_production(blueprint) for blueprint in blueprints]
+		if assessments:
+			input_rates, output_rates = RECIPE_MATRIX.rates(
+				numpy.stack([assessment._input_weights for assessment in assessments]),
+				numpy.stack([assessment._output_weights for assessment in assessments]))
+			for assessment, assessment_inputs, assessment_outputs in zip(assessments, input_rates, output_rates):
+				assessment._set_production(assessment_inputs, assessment_outputs)
+		return assessments
+
 	@property
 	def tech_level(self):
 		return max(Machine.registry[item_id].tech_level if item_id in Machine.registry else 0 for item_id in self.building_counter)
@@ -18,6 +18,8 @@
 #
 #	Johannes Bauer <JohannesBauer@gmx.de>
 
+import collections
+import copy
 import datetime
 import gzip
 import base64
@@ -27,6 +29,11 @@ from .MD5 import DysonSphereMD5
 from .Tools import DateTimeTools
 from .BlueprintData import BlueprintData
 
+BlueprintHeader = collections.namedtuple("BlueprintHeader", [ "layout", "icons", "timestamp", "game_version", "short_desc", "long_desc" ])
+
+class InvalidHashValueException(Exception):
+	pass
+
 class Blueprint():
 	def __init__(self, game_version, data, layout = 10, icon0 = 0, icon1 = 0, icon2 = 0, icon3 = 0, icon4 = 0, timestamp = None, short_desc = "Short description", long_desc = "Long description"):
 		if timestamp is None:
@@ -41,8 +48,32 @@ class Blueprint():
 		self._game_version = game_version
 		self._short_desc = short_desc
 		self._long_desc = long_desc
+		self._b64data = None
+		self._decoded_data = None
+		self._lazy = False
 		self._data = data
 
+	def _repack_if_dirty(self):
+		if self._decoded_data is not None and self._decoded_data.dirty:
+			# Re-pack the modified decoded data, but keep it cached
+			self._uncompressed_data = self._decoded_data.serialize()
+			self._b64data = None
+			self._decoded_data.mark_clean()
+
+	@property
+	def _data(self):
+		self._repack_if_dirty()
+		if self._uncompressed_data is None and self._b64data is not None:
+			# Lazily loaded blueprint; decode the payload on first access
+			self._uncompressed_data = gzip.decompress(base64.b64decode(self._b64data))
+		return self._uncompressed_data
+
+	@_data.setter
+	def _data(self, value):
+		self._uncompressed_data = value
+		self._b64data = None
+		self._decoded_data = None
+
 	@property
 	def timestamp(self):
 		return self._timestamp
@@ -74,44 +105,155 @@ class Blueprint():
 		assert(isinstance(value, str))
 		self._long_desc = value
 
+	def decode(self, columnar = False):
+		"""
+		Returns the decoded blueprint data. It is decoded once and cached; modifications to it are packed again when
+		the blueprint is serialized. With columnar set, the buildings are held in a BuildingTable and, unless the data
+		was already decoded, no building objects are created.
+		"""
+		if self._decoded_data is None:
+			self._decoded_data = BlueprintData.deserialize(self._data, columnar = columnar, lazy = self._lazy and not columnar)
+		elif columnar:
+			# Converts already decoded buildings to the table
+			self._decoded_data.building_table
+		return self._decoded_data
+
 	@property
 	def decoded_data(self):
-		return BlueprintData.deserialize(self._data)
+		return self.decode()
+
+	@property
+	def building_table(self):
+		"""
+		Columnar view of the buildings (see BuildingTable).
+		"""
+		return self.decode(columnar = True).building_table
+
+	def iter_buildings(self, chunk_size = 64 * 1024):
+		"""
+		Yields the buildings of this blueprint. For a lazily read blueprint whose payload was not decoded yet, the
+		payload is decoded while iterating, so memory use stays constant regardless of the blueprint size.
+		"""
+		if (self._uncompressed_data is not None) or (self._decoded_data is not None) or (self._b64data is None):
+			yield from self.decoded_data.buildings
+			return
+		# Base64 decodes in groups of four characters
+		chunk_size -= chunk_size % 4
+		b64data = self._b64data
+		yield from BlueprintData.iter_buildings(base64.b64decode(b64data[offset : offset + chunk_size]) for offset in range(0, len(b64data), chunk_size))
+
+	def copy_with_data(self, data):
+		"""
+		Returns a copy of this blueprint, header included, that carries the given uncompressed data instead.
+		"""
+		blueprint = copy.copy(self)
+		blueprint._data = data
+		return blueprint
+
+	@staticmethod
+	def _split_hash(bp_string):
+		"""
+		Returns a view of the hashed part of the encoded blueprint string and the reference hash value.
+		"""
+		encoded_bp_string = bp_string.encode("utf-8")
+		index = encoded_bp_string.rindex(b"\"")
+		ref_value = encoded_bp_string[index + 1 : ].decode("ascii").lower().strip()
+		return (memoryview(encoded_bp_string)[:index], ref_value)
 
 	@classmethod
-	def from_blueprint_string(cls, bp_string, validate_hash = True):
+	def validate_hashes(cls, bp_strings):
+		"""
+		Checks the hash values of many blueprint strings in one batch. Returns a list of booleans.
+		"""
+		(hashed_data, ref_values) = zip(*(cls._split_hash(bp_string) for bp_string in bp_strings)) if bp_strings else ((), ())
+		hash_values = DysonSphereMD5.hexdigest_many(hashed_data, DysonSphereMD5.Variant.MD5F)
+		return [ ref_value == hash_value for (ref_value, hash_value) in zip(ref_values, hash_values) ]
+
+	@classmethod
+	def from_blueprint_string(cls, bp_string, validate_hash = True, lazy = False):
+		"""
+		Parses a blueprint string. In lazy mode, only the header is parsed right away; the base64/gzip payload
+		is decoded on first access of the blueprint data, and each building only once it is accessed.
+		"""
 		if validate_hash:
-			index = bp_string.rindex("\"")
-			hashed_data = bp_string[:index]
-			ref_value = bp_string[index + 1 : ].lower().strip()
-			hash_value = DysonSphereMD5(DysonSphereMD5.Variant.MD5F).update(hashed_data.encode("utf-8")).hexdigest()
+			(hashed_data, ref_value) = cls._split_hash(bp_string)
+			hash_value = DysonSphereMD5(DysonSphereMD5.Variant.MD5F).update(hashed_data).hexdigest()
 			if ref_value != hash_value:
 				raise InvalidHashValueException("Blueprint string has invalid has value.")
 
-		assert(bp_string.startswith("BLUEPRINT:"))
-		components = bp_string[10:].split(",")
+		header_end = bp_string.index("\"")
+		header = cls._parse_header(bp_string[:header_end])
+
+		b64data_hash_split = bp_string[header_end + 1 : ].split("\"")
+		assert(len(b64data_hash_split) == 2)
+		(b64data, hash_value) = b64data_hash_split
+
+		if lazy:
+			bp = cls.from_header(header, data = None)
+		else:
+			compressed_data = base64.b64decode(b64data)
+			bp = cls.from_header(header, data = gzip.decompress(compressed_data))
+		# Keep the original payload so that it can be written back as-is while unmodified
+		bp._b64data = b64data
+		bp._lazy = lazy
+		return bp
+
+	@classmethod
+	def _parse_header(cls, header):
+		"""
+		Parses the header of a blueprint string, i.e., everything in front of the first quotation mark.
+		"""
+		assert(header.startswith("BLUEPRINT:"))
+		components = header[10:].split(",")
 
 		assert(len(components) == 12)
-		(fixed0_1, layout, icon0, icon1, icon2, icon3, icon4, fixed0_2, timestamp, game_version, short_desc, b64data_hash) = components
+		(fixed0_1, layout, icon0, icon1, icon2, icon3, icon4, fixed0_2, timestamp, game_version, short_desc, long_desc) = components
 
 		(fixed0_1, layout, icon0, icon1, icon2, icon3, icon4, fixed0_2, timestamp) = (int(fixed0_1), int(layout), int(icon0), int(icon1), int(icon2), int(icon3), int(icon4), int(fixed0_2), int(timestamp))
 		assert(fixed0_1 == 0)
 		assert(fixed0_2 == 0)
 		timestamp = DateTimeTools.csharp_to_datetime(timestamp)
 		short_desc = urllib.parse.unquote(short_desc)
+		long_desc = urllib.parse.unquote(long_desc)
+		return BlueprintHeader(layout = layout, icons = (icon0, icon1, icon2, icon3, icon4), timestamp = timestamp, game_version = game_version, short_desc = short_desc, long_desc = long_desc)
 
-		b64data_hash_split = b64data_hash.split("\"")
-		assert(len(b64data_hash_split) == 3)
+	@classmethod
+	def from_header(cls, header, data):
+		(icon0, icon1, icon2, icon3, icon4) = header.icons
+		return cls(layout = header.layout, icon0 = icon0, icon1 = icon1, icon2 = icon2, icon3 = icon3, icon4 = icon4, timestamp = header.timestamp, game_version = header.game_version, short_desc = header.short_desc, long_desc = header.long_desc, data = data)
 
-		(long_desc, b64data, hash_value) = b64data_hash_split
-		long_desc = urllib.parse.unquote(long_desc)
-		compressed_data = base64.b64decode(b64data)
-		data = gzip.decompress(compressed_data)
-		return cls(layout = layout, icon0 = icon0, icon1 = icon1, icon2 = icon2, icon3 = icon3, icon4 = icon4, timestamp = timestamp, game_version = game_version, short_desc = short_desc, long_desc = long_desc, data = data)
+	@classmethod
+	def peek_header(cls, filename, chunk_size = 4096):
+		"""
+		Reads only the header of a blueprint file (up to the first quotation mark) and returns it as a
+		BlueprintHeader. Neither the payload nor the hash are read.
+		"""
+		pieces = [ ]
+		with open(filename) as f:
+			while True:
+				chunk = f.read(chunk_size)
+				if not chunk:
+					raise ValueError(f"Blueprint file has no payload: {filename}")
+				index = chunk.find("\"")
+				if index >= 0:
+					pieces.append(chunk[:index])
+					break
+				pieces.append(chunk)
+		return cls._parse_header("".join(pieces))
+
+	def _b64_payload(self):
+		"""
+		Returns the base64 encoded payload. The original payload is reused for as long as the data is unmodified,
+		so re-serializing a blueprint with only header changes does not compress anything.
+		"""
+		self._repack_if_dirty()
+		if self._b64data is None:
+			compressed_data = gzip.compress(self._uncompressed_data)
+			self._b64data = base64.b64encode(compressed_data).decode("ascii")
+		return self._b64data
 
 	def serialize(self):
-		compressed_data = gzip.compress(self._data)
-		b64_data = base64.b64encode(compressed_data).decode("ascii")
+		b64_data = self._b64_payload()
 
 		components = [ ]
 		components.append("0")
@@ -145,9 +287,9 @@ class Blueprint():
 		}
 
 	@classmethod
-	def read_from_file(cls, filename, validate_hash = True):
+	def read_from_file(cls, filename, validate_hash = True, lazy = False):
 		with open(filename) as f:
-			return cls.from_blueprint_string(f.read(), validate_hash = validate_hash)
+			return cls.from_blueprint_string(f.read(), validate_hash = validate_hash, lazy = lazy)
 
 	def write_to_file(self, filename):
 		with open(filename, "w") as f:
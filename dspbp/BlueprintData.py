@@ -19,7 +19,11 @@
 #	Johannes Bauer <JohannesBauer@gmx.de>
 
 import collections
+import collections.abc
 import enum
+import functools
+import struct
+import zlib
 
 from .NamedStruct import NamedStruct
 from .Enums import DysonSphereItem, LogisticsStationDirection, ProliferationEffect
@@ -29,6 +33,10 @@ PLANETARY_LOGISTICS_STATION_STORAGE_SIZE = 4
 INTERSTELLAR_LOGISTICS_STATION_STORAGE_SIZE = 5
 CONVEYORS = [dsi.ConveyorBeltMKI, dsi.ConveyorBeltMKII, dsi.ConveyorBeltMKIII]
 
+@functools.cache
+def _parameter_struct(count):
+	return struct.Struct(f"<{count}L")
+
 class ParameterType(enum.StrEnum):
 	CONVEYOR = 'conveyer'
 	PRODUCTION = 'production'
@@ -38,41 +46,54 @@ class ParameterType(enum.StrEnum):
 class CustomizedParameters():
 	SENTINEL = ParameterType.UNKNOWN
 	"""
-	Base class for buildings with understood parameters which allows them to be reconstructed.
+	Base class for buildings with understood parameters. The parsed view writes any change through to the
+	building's raw parameters, so the raw parameters are always what gets packed.
 	"""
-	def __init__(self, parameters):
+	def __init__(self, parameters, on_change = None):
 		self._raw_parameters = parameters
+		self._on_change = on_change
 
 	@property
 	def raw_parameters(self):
 		"""
-		Returns a copy of the raw parameters for this instance, updated with any value changes
+		Returns the raw parameters this view writes through to
 		"""
-		parameters = list(self._raw_parameters)
-		for index, value in self._encode_parameter_map.items():
-			value = (1 if value else 0) if isinstance(value, bool) else value
-			if not isinstance(value, int):
-				raise ValueError(f'Unable to convert {value} parameter (index={index} for {self}')
-			parameters[index] = value
-		return parameters
-
-	@property
-	def _encode_parameter_map(self):
+		return self._raw_parameters
+
+	@staticmethod
+	def _encode_value(value):
+		value = (1 if value else 0) if isinstance(value, bool) else value
+		if not isinstance(value, int):
+			raise ValueError(f'Unable to convert {value} parameter')
+		return int(value)
+
+	def _write(self, index, value):
+		value = self._encode_value(value)
+		# Notified before writing, so that a building which may no longer be edited is left unchanged
+		if self._on_change is not None:
+			self._on_change()
+		self._raw_parameters[index] = value
+
+	def set_parameter(self, key, value):
 		"""
-		Returns a map of parameter index to values. Any missing parameters will use their original value.
+		Sets one of the named parameters, e.g. set_parameter('proliferation_effect', ProliferationEffect.Speed)
 		"""
 		if not hasattr(self, '_PARAMETER_KEY_OFFSETS') or not hasattr(self, '_PARAMETERS_OFFSET'):
 			raise NotImplementedError(f'{self.__class__} unable to map parameter to original indices')
-		# For most parameters, this simple approach is sufficient
-		mapping = {}
-		for key, offset in self._PARAMETER_KEY_OFFSET.items():
-			mapping[self._PARAMETERS_OFFSET + offset] = getattr(self.parameters, key)
-		return mapping
+		index = self._PARAMETERS_OFFSET + self._PARAMETER_KEY_OFFSETS[key]
+		if index >= len(self._raw_parameters):
+			raise ValueError(f'{self.__class__.__name__} has no {key} parameter (only {len(self._raw_parameters)} parameters)')
+		self._write(index, value)
+		self._parameters = self._parse_parameters(self._raw_parameters)
 
+	@property
+	def parameters(self):
+		return self._parameters
 
 
 class LogisticsDistributorParameters(CustomizedParameters):
 	_Parameters = collections.namedtuple('Parameters', [ "supply_icarus_logic", "supply_logic", "work_energy", "autofill"])
+	_PARAMETERS_OFFSET = 0
 	_PARAMETER_KEY_OFFSETS = {
 		'supply_icarus_logic' : 0,
 		'supply_logic' : 1,
@@ -84,16 +105,18 @@ class LogisticsDistributorParameters(CustomizedParameters):
 		'supply_logic' : LogisticsStationDirection
 	}
 
-	def __init__(self, parameters):
-		super().__init__(parameters)
-		self._parameters = self._Parameters(**{
+	def __init__(self, parameters, on_change = None):
+		super().__init__(parameters, on_change)
+		self._parameters = self._parse_parameters(parameters)
+
+	def _parse_parameters(self, parameters):
+		return self._Parameters(**{
 			key :
 				self.__PARAMETER_CONVERTERS.get(key, lambda x: x)(parameters[offset]) for key, offset in self._PARAMETER_KEY_OFFSETS.items()
 		})
 
-	@property
-	def parameters(self):
-		return self._parameters
+	def to_dict(self):
+		return self.parameters._asdict()
 
 class ConveyorBeltParameters(CustomizedParameters):
 	SENTINEL = ParameterType.CONVEYOR
@@ -104,18 +127,16 @@ class ConveyorBeltParameters(CustomizedParameters):
 		'memo_number' : 1,
 	}
 
-	def __init__(self, parameters):
-		super().__init__(parameters)
+	def __init__(self, parameters, on_change = None):
+		super().__init__(parameters, on_change)
+		self._parameters = self._parse_parameters(parameters)
+
+	def _parse_parameters(self, parameters):
 		if parameters:
-			self._parameters = self._Parameters(**{
+			return self._Parameters(**{
 				key : parameters[offset] for key, offset in self._PARAMETER_KEY_OFFSETS.items()
 			})
-		else:
-			self._parameters = None
-
-	@property
-	def parameters(self):
-		return self._parameters
+		return None
 
 	def to_dict(self):
 		if self.parameters:
@@ -134,27 +155,26 @@ class ProductionBuildingParameters(CustomizedParameters):
 	_PARAMETER_CONVERTERS = {
 		'proliferation_effect' : ProliferationEffect
 	}
-	def __init__(self, parameters):
-		super().__init__(parameters)
+	def __init__(self, parameters, on_change = None):
+		super().__init__(parameters, on_change)
+		self._parameters = self._parse_parameters(parameters)
+
+	def _parse_parameters(self, parameters):
 		try:
-			self._parameters = self._Parameters(**{
+			return self._Parameters(**{
 				key : self._PARAMETER_CONVERTERS.get(key, lambda x: x)(parameters[offset]) for key, offset in self._PARAMETER_KEY_OFFSETS.items()
 				})
 		# Sometimes we get an empty list here...not clear why. As a placeholder, just give a fake value.
 		# Eventually, we need to track down the source of this issue.
 		except IndexError:
 			parameters = [ProliferationEffect.Product]
-			self._parameters = self._Parameters(**{
+			return self._Parameters(**{
 				key : self._PARAMETER_CONVERTERS.get(key, lambda x: x)(parameters[offset]) for key, offset in self._PARAMETER_KEY_OFFSETS.items()
 				})
 		except Exception:
 			print(f'Parameters: {parameters}')
 			raise
 
-	@property
-	def parameters(self):
-		return self._parameters
-
 	def to_dict(self):
 		return self.parameters._asdict()
 
@@ -188,12 +208,11 @@ class StationParameters(CustomizedParameters):
 		'vessel_count': 7,
 	}
 
-	def __init__(self, parameters, storage_len, slots_len):
-		super().__init__(parameters)
+	def __init__(self, parameters, storage_len, slots_len, on_change = None):
+		super().__init__(parameters, on_change)
 		self._storage = self._parse_storage(parameters, storage_len)
 		self._slots = self._parse_slots(parameters, slots_len)
 		self._parameters = self._parse_parameters(parameters)
-		self._raw_parameters = parameters
 
 	@property
 	def storage(self):
@@ -203,63 +222,47 @@ class StationParameters(CustomizedParameters):
 	def slots(self):
 		return self._slots
 
-	@property
-	def parameters(self):
-		return self._parameters
-
-	@property
-	def _encode_parameter_map(self):
-		mapping = {}
-		for ix, storage in enumerate(self.storage):
-			storage_offset = self._STORAGE_OFFSET + (6 * ix)
-			for key, offset in self._STORAGE_KEY_OFFSETS.items():
-				mapping[storage_offset + offset] = storage[key] if storage else 0
-		for ix, slot in enumerate(self.slots):
-			slot_offset  = self._SLOTS_OFFSET + (4 * ix)
-			for key, offset in self._SLOT_KEY_OFFSETS.items():
-				original_value = self._raw_parameters[slot_offset + offset]
-				mapping[slot_offset + offset] = slot[key] if slot else original_value
-		for key, offset in self._PARAMETER_KEY_OFFSETS.items():
-			mapping[self._PARAMETERS_OFFSET + offset] = getattr(self.parameters, key)
-		return mapping
-
 	def set_storage(self, storage_ix, key, value):
 		if storage_ix >= len(self.storage):
 			raise ValueError(f'Storage {storage_ix} exceeds storage allocation')
-		offset = self._STORAGE_OFFSET + (6 * storage_ix) + self._STORAGE_KEY_OFFSETS[key]
-		self._raw_parameters[offset] = value
-		# self.storage[storage_ix][key] = value
-		# print(f'Storage is now: {self.storage[storage_ix]}')
+		storage_offset = self._STORAGE_OFFSET + (6 * storage_ix)
+		self._write(storage_offset + self._STORAGE_KEY_OFFSETS[key], value)
+		self._storage[storage_ix] = self._parse_storage_entry(self._raw_parameters, storage_offset)
+
+	def set_slot(self, slot_ix, key, value):
+		if slot_ix >= len(self.slots):
+			raise ValueError(f'Slot {slot_ix} exceeds slot allocation')
+		slot_offset = self._SLOTS_OFFSET + (4 * slot_ix)
+		self._write(slot_offset + self._SLOT_KEY_OFFSETS[key], value)
+		self._slots[slot_ix] = self._parse_slot(self._raw_parameters, slot_offset)
+
+	@staticmethod
+	def _parse_storage_entry(parameters, offset):
+		if parameters[offset + 0] == 0:
+			# Storage unused
+			return None
+		return {
+			"item_id": parameters[offset + 0],
+			"local_logic": parameters[offset + 1],
+			"remote_logic": parameters[offset + 2],
+			"max_count": parameters[offset + 3],
+		}
 
 	def _parse_storage(self, parameters, storage_len):
-		storage = [ ]
-		for offset in range(self._STORAGE_OFFSET, self._STORAGE_OFFSET + (6 * storage_len), 6):
-			item_id = parameters[offset + 0]
-			if item_id == 0:
-				# Storage unused
-				storage.append(None)
-			else:
-				storage.append({
-					"item_id": parameters[offset + 0],
-					"local_logic": parameters[offset + 1],
-					"remote_logic": parameters[offset + 2],
-					"max_count": parameters[offset + 3],
-				})
-		return storage
+		return [ self._parse_storage_entry(parameters, offset) for offset in range(self._STORAGE_OFFSET, self._STORAGE_OFFSET + (6 * storage_len), 6) ]
+
+	@staticmethod
+	def _parse_slot(parameters, offset):
+		if parameters[offset + 1] == 0:
+			# Slot unused
+			return None
+		return {
+			"direction": LogisticsStationDirection(parameters[offset + 0]),
+			"storage_index": parameters[offset + 1],
+		}
 
 	def _parse_slots(self, parameters, slots_len):
-		slots = [ ]
-		for offset in range(self._SLOTS_OFFSET, self._SLOTS_OFFSET + (4 * slots_len), 4):
-			storage_index = parameters[offset + 1]
-			if storage_index == 0:
-				# Slot unused
-				slots.append(None)
-			else:
-				slots.append({
-					"direction": LogisticsStationDirection(parameters[offset + 0]),
-					"storage_index": parameters[offset + 1],
-				})
-		return slots
+		return [ self._parse_slot(parameters, offset) for offset in range(self._SLOTS_OFFSET, self._SLOTS_OFFSET + (4 * slots_len), 4) ]
 
 	def _parse_parameters(self, parameters):
 		args = {
@@ -300,6 +303,16 @@ class BlueprintArea():
 	def size(self):
 		return self._BLUEPRINT_AREA.size
 
+	@property
+	def data(self):
+		return self._fields
+
+	def replace(self, **fields):
+		"""
+		Replaces the given fields of this area, e.g. area.replace(width = 20). The owning BlueprintData must be marked dirty.
+		"""
+		self._fields = self._fields._replace(**fields)
+
 	def to_dict(self):
 		return self._fields._asdict()
 
@@ -311,9 +324,26 @@ class BlueprintArea():
 
 	@classmethod
 	def deserialize(cls, data, offset):
-		fields = cls._BLUEPRINT_AREA.unpack_head(data, offset)
+		fields = cls._BLUEPRINT_AREA.unpack_from(data, offset)
 		return cls(fields)
 
+def parse_parameters(item, parameters, on_change = None):
+	"""
+	Returns the typed view of the raw parameters of a building of this item (or the raw parameters for buildings
+	without one).
+	"""
+	if item == DysonSphereItem.PlanetaryLogisticsStation:
+		return StationParameters(parameters, storage_len = PLANETARY_LOGISTICS_STATION_STORAGE_SIZE, slots_len = 12, on_change = on_change)
+	elif item == DysonSphereItem.InterstellarLogisticsStation:
+		return StationParameters(parameters, storage_len = INTERSTELLAR_LOGISTICS_STATION_STORAGE_SIZE, slots_len = 12, on_change = on_change)
+	elif item == DysonSphereItem.LogisticsDistributor:
+		return LogisticsDistributorParameters(parameters, on_change = on_change)
+	elif item in PRODUCTION_MACHINES:
+		return ProductionBuildingParameters(parameters, on_change = on_change)
+	elif item in CONVEYORS:
+		return ConveyorBeltParameters(parameters, on_change = on_change)
+	return parameters
+
 class BlueprintBuilding():
 	_BLUEPRINT_BUILDING = NamedStruct((
 		("L", "index"),
@@ -344,6 +374,58 @@ class BlueprintBuilding():
 	def __init__(self, fields, parameters):
 		self._fields = fields
 		self._parameters = parameters
+		self._typed_parameters = None
+		self._dirty = False
+		# (data, offset) of the bytes this building was decoded from, copied verbatim while it is unmodified
+		self._source = None
+		# Called when fixed fields are replaced; set by the BlueprintData this building belongs to
+		self._on_change = None
+		self._detached = False
+
+	@property
+	def dirty(self):
+		return self._dirty
+
+	def mark_dirty(self):
+		self._check_attached()
+		self._dirty = True
+
+	def _detach(self):
+		# The BlueprintData no longer holds this building, edits to it would be lost
+		self._detached = True
+		self._on_change = None
+
+	def _check_attached(self):
+		if self._detached:
+			raise ValueError("Building is no longer part of its blueprint data (it was converted to a building table)")
+
+	def mark_clean(self):
+		if self._dirty:
+			# The original bytes are outdated now
+			self._source = None
+			self._dirty = False
+
+	def source_span(self):
+		"""
+		Returns (data, start, end) of the original bytes of this building, or None if it has to be packed.
+		"""
+		if self._dirty or self._source is None:
+			return None
+		(data, offset) = self._source
+		return (data, offset, offset + self.size)
+
+	def replace(self, **fields):
+		"""
+		Replaces the given fixed fields of this building, e.g. building.replace(recipe_id = 2)
+		"""
+		self._check_attached()
+		self._fields = self._fields._replace(**fields)
+		if "item_id" in fields:
+			# A different building type interprets the parameters differently
+			self._typed_parameters = None
+		self._dirty = True
+		if self._on_change is not None:
+			self._on_change()
 
 	@property
 	def item(self):
@@ -362,17 +444,16 @@ class BlueprintBuilding():
 
 	@property
 	def parameters(self):
-		if self.item == DysonSphereItem.PlanetaryLogisticsStation:
-			return StationParameters(self._parameters, storage_len = PLANETARY_LOGISTICS_STATION_STORAGE_SIZE, slots_len = 12)
-		elif self.item == DysonSphereItem.InterstellarLogisticsStation:
-			return StationParameters(self._parameters, storage_len = INTERSTELLAR_LOGISTICS_STATION_STORAGE_SIZE, slots_len = 12)
-		elif self.item == DysonSphereItem.LogisticsDistributor:
-			return LogisticsDistributorParameters(self._parameters)
-		elif self.item in PRODUCTION_MACHINES:
-			return ProductionBuildingParameters(self._parameters)
-		elif self.item in CONVEYORS:
-			return ConveyorBeltParameters(self._parameters)
-		return self._parameters
+		"""
+		The typed view of the parameters (or the raw parameters for buildings without one). It is created once
+		and writes any edits through to the raw parameters.
+		"""
+		if self._typed_parameters is None:
+			self._typed_parameters = self._parse_parameters()
+		return self._typed_parameters
+
+	def _parse_parameters(self):
+		return parse_parameters(self.item, self._parameters, on_change = self.mark_dirty)
 
 	@property
 	def size(self):
@@ -388,23 +469,150 @@ class BlueprintBuilding():
 		return result
 
 	def pack(self):
-		raw_parameters = self.raw_parameters
-		try:
-			raw_parameters = self.parameters.raw_parameters
-		except AttributeError:
-			pass
+		# Typed parameter views write through, so the raw parameters are always up to date
+		raw_parameters = self._parameters
+		if len(raw_parameters) != self._fields.parameter_count:
+			raise  ValueError("Parameter length mismatch")
+		return self._BLUEPRINT_BUILDING.pack(self._fields._asdict()) + _parameter_struct(len(raw_parameters)).pack(*raw_parameters)
+
+	def pack_into(self, buffer, offset):
+		raw_parameters = self._parameters
 		if len(raw_parameters) != self._fields.parameter_count:
 			raise  ValueError("Parameter length mismatch")
-		return self._BLUEPRINT_BUILDING.pack(self._fields._asdict()) + b''.join([value.to_bytes(length=4, byteorder='little') for value in raw_parameters])
+		self._BLUEPRINT_BUILDING.pack_into(buffer, offset, self._fields._asdict())
+		_parameter_struct(len(raw_parameters)).pack_into(buffer, offset + self._BLUEPRINT_BUILDING.size, *raw_parameters)
 
 	@classmethod
 	def deserialize(cls, data, offset):
-		fields = cls._BLUEPRINT_BUILDING.unpack_head(data, offset)
+		fields = cls._BLUEPRINT_BUILDING.unpack_from(data, offset)
 		offset += cls._BLUEPRINT_BUILDING.size
 
-		parameters = [ int.from_bytes(data[offset + 4 * i : offset + (4 * (i + 1)) ], byteorder = "little") for i in range(fields.parameter_count) ]
+		parameters = list(_parameter_struct(fields.parameter_count).unpack_from(data, offset))
 		return cls(fields, parameters)
 
+class LazyBuildingList(collections.abc.Sequence):
+	"""
+	Sequence of the buildings of a payload which decodes a building only when it is indexed or iterated. Building
+	offsets are found with one cheap pass that only reads the parameter counts. Decoded buildings are kept, so edits
+	to them persist; buildings which were never decoded are packed by copying their original bytes.
+	"""
+	_PARAMETER_COUNT = struct.Struct("<H")
+
+	def __init__(self, data, offset, building_count):
+		building_struct = BlueprintBuilding._BLUEPRINT_BUILDING
+		parameter_count_offset = building_struct.offset_of("parameter_count")
+		self._data = data
+		self._offsets = [ ]
+		for _ in range(building_count):
+			self._offsets.append(offset)
+			(parameter_count, ) = self._PARAMETER_COUNT.unpack_from(data, offset + parameter_count_offset)
+			offset += building_struct.size + (4 * parameter_count)
+		self._offsets.append(offset)
+		self._buildings = [ None ] * building_count
+		# Passed on to buildings as they are decoded
+		self.on_change = None
+
+	@property
+	def size(self):
+		return self._offsets[-1] - self._offsets[0]
+
+	def __len__(self):
+		return len(self._buildings)
+
+	def __getitem__(self, index):
+		if isinstance(index, slice):
+			return [ self[i] for i in range(*index.indices(len(self))) ]
+		building = self._buildings[index]
+		if building is None:
+			if index < 0:
+				index += len(self._buildings)
+			building = BlueprintBuilding.deserialize(self._data, self._offsets[index])
+			building._source = (self._data, self._offsets[index])
+			building._on_change = self.on_change
+			self._buildings[index] = building
+		return building
+
+	def decoded(self):
+		"""
+		Iterates over the buildings which were decoded so far.
+		"""
+		return (building for building in self._buildings if building is not None)
+
+	def column(self, fieldname):
+		"""
+		Returns one fixed field of all buildings. Buildings that were not decoded yet are not decoded for this.
+		"""
+		building_struct = BlueprintBuilding._BLUEPRINT_BUILDING
+		fieldtype = { name: fieldtype for (fieldtype, name) in building_struct.fields }[fieldname]
+		field_struct = struct.Struct("<" + fieldtype)
+		field_offset = building_struct.offset_of(fieldname)
+		values = [ field_struct.unpack_from(self._data, offset + field_offset)[0] for offset in self._offsets[:-1] ]
+		for (index, building) in enumerate(self._buildings):
+			if building is not None:
+				# Decoded buildings may have been edited
+				values[index] = getattr(building.data, fieldname)
+		return values
+
+	def item_ids(self):
+		"""
+		Returns the item ids of all buildings without decoding them.
+		"""
+		return self.column("item_id")
+
+	def indices_of(self, item_ids):
+		"""
+		Returns the indices of the buildings whose item id is in item_ids without decoding any building, e.g.
+		indices_of([ dsi.PlanetaryLogisticsStation, dsi.InterstellarLogisticsStation ])
+		"""
+		item_ids = set(item_ids)
+		return [ index for (index, item_id) in enumerate(self.item_ids()) if item_id in item_ids ]
+
+	def spans(self):
+		"""
+		Yields (building, source_span) for all buildings; undecoded buildings are None with their original span.
+		"""
+		for (index, building) in enumerate(self._buildings):
+			if building is None:
+				yield (None, (self._data, self._offsets[index], self._offsets[index + 1]))
+			else:
+				yield (building, building.source_span())
+
+class _DecompressingReader():
+	"""
+	Reads structs from a gzip compressed stream, decompressing only as much as is needed into a small rolling buffer.
+	"""
+	def __init__(self, compressed_chunks, window_size = 64 * 1024):
+		self._compressed_chunks = iter(compressed_chunks)
+		self._decompressor = zlib.decompressobj(wbits = 16 + zlib.MAX_WBITS)
+		self._window_size = window_size
+		self._buffer = bytearray()
+		self._position = 0
+
+	def ensure(self, size):
+		"""
+		Makes at least size bytes available at the current position and returns (buffer, position).
+		"""
+		while len(self._buffer) - self._position < size:
+			# Drop everything consumed so far before decompressing more
+			del self._buffer[:self._position]
+			self._position = 0
+			compressed_data = self._decompressor.unconsumed_tail
+			if not compressed_data:
+				compressed_data = next(self._compressed_chunks, None)
+				if compressed_data is None:
+					raise ValueError("Blueprint data ended unexpectedly")
+			self._buffer += self._decompressor.decompress(compressed_data, max(size, self._window_size))
+		return (self._buffer, self._position)
+
+	def unpack(self, named_struct):
+		(buffer, position) = self.ensure(named_struct.size)
+		self._position += named_struct.size
+		return named_struct.unpack_from(buffer, position)
+
+	def skip(self, size):
+		self.ensure(size)
+		self._position += size
+
 class BlueprintData():
 	_HEADER = NamedStruct((
 		("L", "version"),
@@ -420,32 +628,263 @@ class BlueprintData():
 		("L", "building_count"),
 	))
 
-	def __init__(self, header, areas, buildings):
+	def __init__(self, header, areas, buildings = None, building_table = None):
+		# Exactly one of buildings (a list of BlueprintBuilding) or building_table (a BuildingTable) holds the
+		# buildings; accessing the other representation converts to it.
 		self._header = header
 		self._areas = areas
 		self._buildings = buildings
+		self._building_table = building_table
+		self._dirty = False
+		# Incremented whenever buildings may have changed, so that indexes over them can tell they are outdated
+		self._generation = 0
+		self._indexes = { }
+		self._indexes_key = None
+		if buildings is not None:
+			self._adopt(buildings)
+
+	def _adopt(self, buildings):
+		if isinstance(buildings, LazyBuildingList):
+			buildings.on_change = self._bump_generation
+		else:
+			for building in buildings:
+				building._on_change = self._bump_generation
+
+	def _bump_generation(self):
+		self._generation += 1
+
+	@property
+	def header(self):
+		return self._header
+
+	def replace_header(self, **fields):
+		self._header = self._header._replace(**fields)
+		self._dirty = True
+
+	@property
+	def areas(self):
+		return self._areas
 
 	@property
 	def buildings(self):
+		if self._buildings is None:
+			self._buildings = self._building_table.to_buildings()
+			self._adopt(self._buildings)
+			self._dirty = self._dirty or self._building_table.dirty
+			self._building_table._detach()
+			self._building_table = None
+			self._bump_generation()
+		return self._buildings
+
+	@property
+	def building_table(self):
+		"""
+		Columnar view of the buildings. Building objects obtained before are no longer part of this data; editing
+		them raises ValueError.
+		"""
+		if self._building_table is None:
+			from .BuildingTable import BuildingTable
+			# Edits pending on the building objects have to be read before they are discarded
+			dirty = self.dirty
+			self._building_table = BuildingTable.from_buildings(self._buildings)
+			self._dirty = dirty
+			for building in self._decoded_buildings():
+				building._detach()
+			self._buildings = None
+			self._bump_generation()
+		return self._building_table
+
+	@property
+	def building_count(self):
+		return len(self._buildings) if self._building_table is None else len(self._building_table)
+
+	@property
+	def dirty(self):
+		"""
+		True if this data was modified since it was deserialized (or last marked clean).
+		"""
+		if self._building_table is not None:
+			return self._dirty or self._building_table.dirty
+		return self._dirty or any(building.dirty for building in self._decoded_buildings())
+
+	def column(self, fieldname):
+		"""
+		Returns one fixed field of all buildings as a list, without creating building objects where avoidable.
+		"""
+		if self._building_table is not None:
+			return self._building_table[fieldname].tolist()
+		if isinstance(self._buildings, LazyBuildingList):
+			return self._buildings.column(fieldname)
+		return [ getattr(building.data, fieldname) for building in self._buildings ]
+
+	def building_parameters(self, index):
+		"""
+		Returns the raw parameters of one building as a list, for reading. Columnar data is not converted to
+		building objects for this.
+		"""
+		if self._building_table is not None:
+			return self._building_table.building_parameters(index).tolist()
+		return self._buildings[index].raw_parameters
+
+	def _index(self, name, build):
+		# Indexes are built on first use and dropped once buildings were edited, added or removed
+		table_generation = self._building_table.generation if self._building_table is not None else None
+		key = (self._generation, table_generation, self.building_count)
+		if key != self._indexes_key:
+			self._indexes = { }
+			self._indexes_key = key
+		if name not in self._indexes:
+			self._indexes[name] = build()
+		return self._indexes[name]
+
+	def indices_by(self, fieldname):
+		"""
+		Returns the building indices grouped by the value of a fixed field (e.g. item_id, recipe_id, filter_id,
+		area_index), as a dict of value to a list of indices in building order.
+		"""
+		def build():
+			index = { }
+			for (building_index, value) in enumerate(self.column(fieldname)):
+				index.setdefault(value, [ ]).append(building_index)
+			return index
+		return self._index(("indices_by", fieldname), build)
+
+	def buildings_with(self, fieldname, *values):
+		"""
+		Returns the buildings, in order, whose field has one of the given values, e.g. buildings_with("item_id", dsi.LogisticsDistributor)
+		"""
+		index = self.indices_by(fieldname)
+		indices = sorted(building_index for value in values for building_index in index.get(value, [ ]))
+		return [ self.buildings[building_index] for building_index in indices ]
+
+	@property
+	def item_counts(self):
+		"""
+		Number of buildings per item_id, in order of first occurrence.
+		"""
+		return self._index("item_counts", lambda: collections.Counter({ item_id: len(indices) for (item_id, indices) in self.indices_by("item_id").items() }))
+
+	@property
+	def item_recipe_counts(self):
+		"""
+		Number of buildings per (item_id, recipe_id), in order of first occurrence.
+		"""
+		return self._index("item_recipe_counts", lambda: collections.Counter(zip(self.column("item_id"), self.column("recipe_id"))))
+
+	@property
+	def graph(self):
+		"""
+		The ConnectivityGraph of the buildings, built on first use.
+		"""
+		from .Graph import ConnectivityGraph
+		return self._index("graph", lambda: ConnectivityGraph.from_blueprint_data(self))
+
+	@property
+	def spatial_index(self):
+		"""
+		The SpatialIndex of the building positions, built on first use.
+		"""
+		from .Spatial import SpatialIndex
+		return self._index("spatial_index", lambda: SpatialIndex.from_blueprint_data(self))
+
+	def _decoded_buildings(self):
+		if isinstance(self._buildings, LazyBuildingList):
+			return self._buildings.decoded()
 		return self._buildings
 
+	def mark_dirty(self):
+		self._dirty = True
+		self._bump_generation()
+
+	def mark_clean(self):
+		self._dirty = False
+		if self._building_table is not None:
+			self._building_table._dirty = False
+		else:
+			for building in self._decoded_buildings():
+				building.mark_clean()
+
 	def to_dict(self):
 		result = self._header._asdict()
 		result["areas"] = [ area.to_dict() for area in self._areas ]
-		result["buildings"] = [ building.to_dict() for building in self._buildings ]
+		result["buildings"] = [ building.to_dict() for building in self.buildings ]
 		return result
 
+	def _building_spans(self):
+		if isinstance(self._buildings, LazyBuildingList):
+			return self._buildings.spans()
+		return ((building, building.source_span()) for building in self._buildings)
+
 	def serialize(self):
-		serialized_data = b''.join(
+		prefix = b''.join(
 			[self._HEADER.pack(self._header._asdict())] +
 			[area.pack() for area in self._areas] +
-			[self._BUILDING_HEADER.pack({'building_count' : len(self._buildings)})] +
-			[building.pack() for building in self._buildings])
-		return serialized_data
+			[self._BUILDING_HEADER.pack({'building_count' : self.building_count})])
+		if self._building_table is not None:
+			return prefix + self._building_table.pack()
+
+		spans = list(self._building_spans())
+		serialized_data = bytearray(len(prefix) + sum((span[2] - span[1]) if span is not None else building.size for (building, span) in spans))
+		serialized_data[:len(prefix)] = prefix
+		offset = len(prefix)
+
+		# Unmodified buildings are copied verbatim; adjacent ones are merged into a single copy
+		run = None
+		for (building, span) in spans:
+			if span is not None:
+				(data, start, end) = span
+				if (run is not None) and (run[0] is data) and (run[2] == start):
+					run[2] = end
+					continue
+				if run is not None:
+					offset = self._copy_run(serialized_data, offset, run)
+				run = [ data, start, end ]
+			else:
+				if run is not None:
+					offset = self._copy_run(serialized_data, offset, run)
+					run = None
+				building.pack_into(serialized_data, offset)
+				offset += building.size
+		if run is not None:
+			offset = self._copy_run(serialized_data, offset, run)
+		return bytes(serialized_data)
+
+	@staticmethod
+	def _copy_run(buffer, offset, run):
+		(data, start, end) = run
+		buffer[offset : offset + (end - start)] = data[start : end]
+		return offset + (end - start)
+
+	@classmethod
+	def iter_buildings(cls, compressed_chunks):
+		"""
+		Yields the buildings of a gzip compressed payload, given as an iterable of chunks, as soon as their bytes
+		are decompressed. Only a small window of the payload is held in memory, regardless of its size.
+		"""
+		reader = _DecompressingReader(compressed_chunks)
+		header = reader.unpack(cls._HEADER)
+		reader.skip(header.area_count * BlueprintArea._BLUEPRINT_AREA.size)
+		building_header = reader.unpack(cls._BUILDING_HEADER)
+
+		building_struct = BlueprintBuilding._BLUEPRINT_BUILDING
+		parameter_count_offset = building_struct.offset_of("parameter_count")
+		for building_id in range(building_header.building_count):
+			(buffer, position) = reader.ensure(building_struct.size)
+			parameter_count = int.from_bytes(buffer[position + parameter_count_offset : position + building_struct.size], byteorder = "little")
+			(buffer, position) = reader.ensure(building_struct.size + (4 * parameter_count))
+			building = BlueprintBuilding.deserialize(buffer, position)
+			reader.skip(building.size)
+			yield building
 
 	@classmethod
-	def deserialize(cls, data):
-		header = cls._HEADER.unpack_head(data)
+	def deserialize(cls, data, columnar = False, lazy = False):
+		"""
+		Decodes the uncompressed blueprint data; with columnar set, the buildings are decoded into a BuildingTable.
+		With lazy set, buildings are only decoded when they are accessed (see LazyBuildingList).
+		"""
+		# Decode straight out of a memoryview with a moving offset; nothing is sliced
+		data = memoryview(data)
+		header = cls._HEADER.unpack_from(data)
 
 		areas = [ ]
 		offset = cls._HEADER.size
@@ -455,11 +894,26 @@ class BlueprintData():
 			offset += area.size
 			areas.append(area)
 
-		buildings = [ ]
-		building_header = cls._BUILDING_HEADER.unpack_head(data, offset)
+		building_header = cls._BUILDING_HEADER.unpack_from(data, offset)
 		offset += cls._BUILDING_HEADER.size
+		if columnar:
+			from .BuildingTable import BuildingTable
+			building_table = BuildingTable.deserialize(data, offset, building_header.building_count)
+			offset += building_table.size
+			if len(data) != offset:
+				print(f'Data length is {len(data)} but {offset} bytes deserialized.')
+			return cls(header, areas, building_table = building_table)
+		if lazy:
+			buildings = LazyBuildingList(data, offset, building_header.building_count)
+			offset += buildings.size
+			if len(data) != offset:
+				print(f'Data length is {len(data)} but {offset} bytes deserialized.')
+			return cls(header, areas, buildings)
+
+		buildings = [ ]
 		for building_id in range(building_header.building_count):
 			building = BlueprintBuilding.deserialize(data, offset)
+			building._source = (data, offset)
 			offset += building.size
 			buildings.append(building)
 
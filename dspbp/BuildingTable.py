@@ -0,0 +1,276 @@
+#	dspbptk - Dyson Sphere Program Blueprint Toolkit
+#	Copyright (C) 2024 Alan Ray
+#
+#	This file is part of dspbptk.
+#
+#	dspbptk is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	dspbptk is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import collections
+import struct
+
+import numpy
+
+from .BlueprintData import BlueprintBuilding
+
+# 64-bit FNV-1a constants, used for row hashes
+_FNV_OFFSET = numpy.uint64(0xcbf29ce484222325)
+_FNV_PRIME = numpy.uint64(0x100000001b3)
+
+# Little endian numpy equivalents of the struct codes used by _BLUEPRINT_BUILDING
+_NUMPY_TYPES = {
+	"b": "i1",
+	"B": "u1",
+	"H": "<u2",
+	"L": "<u4",
+	"f": "<f4",
+}
+
+def hash_columns(columns, hashes = None):
+	"""
+	Combines integer columns (equal-length arrays) into one 64-bit FNV-1a style hash per row.
+	"""
+	for column in columns:
+		if hashes is None:
+			hashes = numpy.full(len(column), _FNV_OFFSET, dtype = numpy.uint64)
+		hashes = (hashes ^ numpy.asarray(column).astype(numpy.uint64)) * _FNV_PRIME
+	# Final avalanche so that nearby values do not give nearby hashes
+	return hashes ^ (hashes >> numpy.uint64(29))
+
+def _building_dtype(named_struct):
+	fields = [ (fieldname, _NUMPY_TYPES[fieldtype]) for (fieldtype, fieldname) in named_struct.fields ]
+	dtype = numpy.dtype(fields)
+	assert dtype.itemsize == named_struct.size
+	return dtype
+
+class BuildingTable():
+	"""
+	Columnar representation of a blueprint's buildings: one packed record per building holding the
+	fixed _BLUEPRINT_BUILDING fields (so every field is a column) plus a flat buffer holding the
+	parameters of all buildings, where building i owns parameters[parameter_offsets[i] : parameter_offsets[i + 1]].
+	"""
+	DTYPE = _building_dtype(BlueprintBuilding._BLUEPRINT_BUILDING)
+	_PARAMETER_COUNT = struct.Struct("<H")
+	_PARAMETER_COUNT_OFFSET = DTYPE.fields["parameter_count"][1]
+
+	def __init__(self, records, parameters, parameter_offsets = None):
+		self._records = records
+		self._parameters = parameters
+		if parameter_offsets is None:
+			parameter_offsets = self._offsets_from_counts(records["parameter_count"])
+		self._parameter_offsets = parameter_offsets
+		self._dirty = False
+		# Incremented on every modification, see BlueprintData indexes
+		self._generation = 0
+		self._detached = False
+
+	@staticmethod
+	def _offsets_from_counts(counts):
+		offsets = numpy.zeros(len(counts) + 1, dtype = numpy.int64)
+		numpy.cumsum(counts, out = offsets[1:])
+		return offsets
+
+	@property
+	def records(self):
+		return self._records
+
+	@property
+	def parameters(self):
+		return self._parameters
+
+	@property
+	def parameter_offsets(self):
+		return self._parameter_offsets
+
+	@property
+	def dirty(self):
+		return self._dirty
+
+	@property
+	def generation(self):
+		return self._generation
+
+	def mark_dirty(self):
+		self._check_attached()
+		self._dirty = True
+		self._generation += 1
+
+	def _detach(self):
+		# The BlueprintData no longer holds this table, edits to it would be lost
+		self._detached = True
+
+	def _check_attached(self):
+		if self._detached:
+			raise ValueError("Building table is no longer part of its blueprint data (it was converted to buildings)")
+
+	def __len__(self):
+		return len(self._records)
+
+	def __getitem__(self, field):
+		"""
+		Returns a whole column, e.g. table["item_id"]. Writing to the column modifies the table; use assign()
+		(or mark_dirty()) so the change is serialized and indexes over it are rebuilt.
+		"""
+		return self._records[field]
+
+	def assign(self, field, value, where = None):
+		"""
+		Sets a fixed field for all buildings, or only for those selected by the boolean mask/index array where.
+		"""
+		if field == "parameter_count":
+			raise ValueError("The parameter count is determined by the parameters")
+		self._check_attached()
+		if where is None:
+			self._records[field] = value
+		else:
+			self._records[field][where] = value
+		self.mark_dirty()
+
+	def assign_parameters(self, positions, values):
+		"""
+		Sets parameters by their positions in the flat parameters buffer (see parameter_offsets).
+		"""
+		self._check_attached()
+		self._parameters[positions] = values
+		self.mark_dirty()
+
+	def resize_parameters(self, where, count):
+		"""
+		Gives the buildings selected by the boolean mask/index array where exactly count parameters. Existing
+		parameters are kept (or truncated), new ones are zero.
+		"""
+		self._check_attached()
+		old_counts = numpy.diff(self._parameter_offsets)
+		new_counts = old_counts.copy()
+		new_counts[where] = count
+		if numpy.array_equal(old_counts, new_counts):
+			return
+		new_offsets = self._offsets_from_counts(new_counts)
+		kept = numpy.minimum(old_counts, new_counts)
+		parameters = numpy.zeros(int(new_offsets[-1]), dtype = numpy.uint32)
+		parameters[self._gather_index(new_offsets[:-1], kept, 1)] = self._parameters[self._gather_index(self._parameter_offsets[:-1], kept, 1)]
+		self._parameters = parameters
+		self._parameter_offsets = new_offsets
+		self._records["parameter_count"] = new_counts
+		self.mark_dirty()
+
+	def building_parameters(self, index):
+		return self._parameters[self._parameter_offsets[index] : self._parameter_offsets[index + 1]]
+
+	def parameter_hashes(self):
+		"""
+		Returns a 64-bit hash of the parameters of each building. Equal parameter lists hash equal.
+		"""
+		counts = numpy.diff(self._parameter_offsets)
+		# Sum of (value + 1) * prime^rank over each building's parameters, wrapping at 64 bits
+		powers = numpy.cumprod(numpy.full(int(counts.max(initial = 0)) + 1, _FNV_PRIME, dtype = numpy.uint64))
+		rank = self._gather_index(numpy.zeros(len(counts), dtype = numpy.int64), counts, 1)
+		terms = (self._parameters.astype(numpy.uint64) + numpy.uint64(1)) * powers[rank]
+		sums = numpy.zeros(len(terms) + 1, dtype = numpy.uint64)
+		numpy.cumsum(terms, out = sums[1:])
+		return (sums[self._parameter_offsets[1:]] - sums[self._parameter_offsets[:-1]]) ^ counts.astype(numpy.uint64)
+
+	def row_hashes(self, parameter_hashes = None):
+		"""
+		Returns a 64-bit hash of each building: all fixed fields plus the parameters. Equal buildings hash equal.
+		"""
+		if parameter_hashes is None:
+			parameter_hashes = self.parameter_hashes()
+		record_bytes = self._records.view(numpy.uint8).reshape(len(self._records), self.DTYPE.itemsize)
+		return hash_columns([ record_bytes[:, column] for column in range(self.DTYPE.itemsize) ] + [ parameter_hashes ])
+
+	def count(self, *fields):
+		"""
+		Counts the buildings per distinct value combination of the given fields, e.g. count("item_id", "recipe_id").
+		Keys are ordered by first occurrence, like counting building by building would.
+		"""
+		if len(self._records) == 0:
+			return collections.Counter()
+		keys, first_index, counts = numpy.unique(numpy.stack([ self._records[field].astype(numpy.int64) for field in fields ], axis = 1), axis = 0, return_index = True, return_counts = True)
+		order = numpy.argsort(first_index)
+		if len(fields) == 1:
+			return collections.Counter({ int(keys[i][0]): int(counts[i]) for i in order })
+		return collections.Counter({ tuple(int(value) for value in keys[i]): int(counts[i]) for i in order })
+
+	@staticmethod
+	def _gather_index(starts, counts, step):
+		# Position of every parameter when building i's parameters start at starts[i] and are step apart
+		rank = numpy.arange(int(counts.sum())) - numpy.repeat(numpy.cumsum(counts) - counts, counts)
+		return numpy.repeat(starts, counts) + (rank * step)
+
+	def select(self, where):
+		"""
+		Returns a new table containing only the buildings selected by the boolean mask/index array where, in order.
+		Indices are kept as-is, so object indices may point at buildings that were not selected.
+		"""
+		records = self._records[where]
+		counts = self._parameter_offsets[1:][where] - self._parameter_offsets[:-1][where]
+		parameters = self._parameters[self._gather_index(self._parameter_offsets[:-1][where], counts, 1)]
+		return BuildingTable(records.copy(), parameters)
+
+	def copy(self):
+		return BuildingTable(self._records.copy(), self._parameters.copy(), self._parameter_offsets.copy())
+
+	@property
+	def size(self):
+		return (len(self._records) * self.DTYPE.itemsize) + (len(self._parameters) * 4)
+
+	def pack(self):
+		counts = numpy.diff(self._parameter_offsets)
+		if not numpy.array_equal(counts, self._records["parameter_count"]):
+			raise ValueError("Parameter length mismatch")
+		record_size = self.DTYPE.itemsize
+
+		# Scatter the records and the parameters into their interleaved byte positions
+		building_offsets = (numpy.arange(len(self._records)) * record_size) + (self._parameter_offsets[:-1] * 4)
+		packed = numpy.empty(self.size, dtype = numpy.uint8)
+		packed[building_offsets[:, None] + numpy.arange(record_size)] = self._records.view(numpy.uint8).reshape(len(self._records), record_size)
+		parameter_positions = self._gather_index(building_offsets + record_size, counts, 4)
+		packed[parameter_positions[:, None] + numpy.arange(4)] = self._parameters.astype("<u4").view(numpy.uint8).reshape(len(self._parameters), 4)
+		return packed.tobytes()
+
+	def to_buildings(self):
+		buildings = [ ]
+		for (index, record) in enumerate(self._records.tolist()):
+			fields = BlueprintBuilding._BLUEPRINT_BUILDING._collection(*record)
+			buildings.append(BlueprintBuilding(fields, self.building_parameters(index).tolist()))
+		return buildings
+
+	@classmethod
+	def from_buildings(cls, buildings):
+		records = numpy.array([ tuple(building.data) for building in buildings ], dtype = cls.DTYPE)
+		parameters = numpy.fromiter((value for building in buildings for value in building.raw_parameters), dtype = numpy.uint32)
+		return cls(records, parameters)
+
+	@classmethod
+	def deserialize(cls, data, offset, building_count):
+		"""
+		Decodes building_count buildings starting at offset in two passes: the first one only reads the parameter
+		counts to find where each building starts, the second one gathers all records and parameters at once.
+		"""
+		record_size = cls.DTYPE.itemsize
+		building_offsets = [ ]
+		counts = [ ]
+		for _ in range(building_count):
+			(parameter_count, ) = cls._PARAMETER_COUNT.unpack_from(data, offset + cls._PARAMETER_COUNT_OFFSET)
+			building_offsets.append(offset)
+			counts.append(parameter_count)
+			offset += record_size + (4 * parameter_count)
+		building_offsets = numpy.array(building_offsets, dtype = numpy.int64)
+		counts = numpy.array(counts, dtype = numpy.int64)
+
+		raw = numpy.frombuffer(data, dtype = numpy.uint8)
+		records = raw[building_offsets[:, None] + numpy.arange(record_size)].view(cls.DTYPE).reshape(building_count)
+		parameter_positions = cls._gather_index(building_offsets + record_size, counts, 4)
+		parameters = raw[parameter_positions[:, None] + numpy.arange(4)].view("<u4").reshape(len(parameter_positions)).astype(numpy.uint32)
+		return cls(records, parameters, cls._offsets_from_counts(counts))
@@ -0,0 +1,146 @@
+#	dspbptk - Dyson Sphere Program Blueprint Toolkit
+#	Copyright (C) 2024 Alan Ray
+#
+#	This file is part of dspbptk.
+#
+#	dspbptk is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	dspbptk is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+# Structural diff of two blueprints. Buildings are compared through row hashes of the BuildingTable (all fixed fields
+# plus the parameters): equal hashes are unchanged buildings, and the remaining buildings are paired by their
+# position (or their index) to find the modified ones. Everything is matched through dicts, so it is linear in the
+# number of buildings.
+
+import collections
+
+import numpy
+
+from .Utils import maybeDysonSphereItem
+
+BuildingChange = collections.namedtuple("BuildingChange", [ "old", "new", "fields", "parameters_changed" ])
+
+MATCH_KEYS = {
+	"position": [ "area_index", "local_offset_x", "local_offset_y", "local_offset_z" ],
+	"index": [ "index" ],
+}
+
+def _match(old_keys, new_keys, old_candidates, new_candidates):
+	"""
+	Pairs old and new candidates (building positions) with equal keys, each candidate at most once and in order.
+	Returns the pairs and the unpaired old and new candidates.
+	"""
+	available = collections.defaultdict(collections.deque)
+	for new in new_candidates:
+		available[new_keys[new]].append(new)
+	pairs = [ ]
+	unpaired_old = [ ]
+	for old in old_candidates:
+		matches = available.get(old_keys[old])
+		if matches:
+			pairs.append((old, matches.popleft()))
+		else:
+			unpaired_old.append(old)
+	paired_new = set(new for (_, new) in pairs)
+	return (pairs, unpaired_old, [ new for new in new_candidates if new not in paired_new ])
+
+class BlueprintDiff():
+	"""
+	Difference between the buildings of two BlueprintData. Buildings are referred to by their position in the
+	respective building list.
+	"""
+	def __init__(self, old_data, new_data, match = "position"):
+		if match not in MATCH_KEYS:
+			raise ValueError(f'Unknown match {match}, can be one of {", ".join(MATCH_KEYS)}')
+		self._old = old_data.building_table
+		self._new = new_data.building_table
+		old_parameter_hashes = self._old.parameter_hashes()
+		new_parameter_hashes = self._new.parameter_hashes()
+		old_hashes = self._old.row_hashes(old_parameter_hashes).tolist()
+		new_hashes = self._new.row_hashes(new_parameter_hashes).tolist()
+
+		(unchanged, old_rest, new_rest) = _match(old_hashes, new_hashes, range(len(old_hashes)), range(len(new_hashes)))
+		old_keys = self._keys(self._old, MATCH_KEYS[match])
+		new_keys = self._keys(self._new, MATCH_KEYS[match])
+		(modified, self._removed, self._added) = _match(old_keys, new_keys, old_rest, new_rest)
+		self._unchanged = unchanged
+		self._modified = self._describe(modified, old_parameter_hashes, new_parameter_hashes)
+
+	@staticmethod
+	def _keys(table, fields):
+		return list(zip(*(table[field].tolist() for field in fields)))
+
+	def _describe(self, pairs, old_parameter_hashes, new_parameter_hashes):
+		if not pairs:
+			return [ ]
+		(old, new) = (numpy.array([ pair[0] for pair in pairs ]), numpy.array([ pair[1] for pair in pairs ]))
+		(old_records, new_records) = (self._old.records[old], self._new.records[new])
+		changed_fields = { field: (old_records[field] != new_records[field]).tolist() for field in self._old.DTYPE.names }
+		parameters_changed = (old_parameter_hashes[old] != new_parameter_hashes[new]).tolist()
+		return [ BuildingChange(old_index, new_index, [ field for (field, changed) in changed_fields.items() if changed[i] ], parameters_changed[i])
+			for (i, (old_index, new_index)) in enumerate(pairs) ]
+
+	@property
+	def unchanged(self):
+		"""
+		(old, new) pairs of identical buildings
+		"""
+		return self._unchanged
+
+	@property
+	def added(self):
+		return self._added
+
+	@property
+	def removed(self):
+		return self._removed
+
+	@property
+	def modified(self):
+		return self._modified
+
+	@property
+	def identical(self):
+		return not (self._added or self._removed or self._modified)
+
+	@staticmethod
+	def _building_summary(table, position):
+		record = table.records[position]
+		item = maybeDysonSphereItem(int(record["item_id"]))
+		return {
+			"index": int(record["index"]),
+			"item_id": item.name if item is not None else int(record["item_id"]),
+			"position": [ float(record["local_offset_x"]), float(record["local_offset_y"]), float(record["local_offset_z"]) ],
+		}
+
+	def to_dict(self):
+		modified = [ ]
+		for change in self._modified:
+			(old_record, new_record) = (self._old.records[change.old], self._new.records[change.new])
+			modified.append({
+				"old": self._building_summary(self._old, change.old),
+				"new": self._building_summary(self._new, change.new),
+				"fields": { field: [ old_record[field].item(), new_record[field].item() ] for field in change.fields },
+				"parameters_changed": change.parameters_changed,
+			})
+		return {
+			"summary": {
+				"unchanged": len(self._unchanged),
+				"added": len(self._added),
+				"removed": len(self._removed),
+				"modified": len(self._modified),
+			},
+			"added": [ self._building_summary(self._new, position) for position in self._added ],
+			"removed": [ self._building_summary(self._old, position) for position in self._removed ],
+			"modified": modified,
+		}
@@ -0,0 +1,75 @@
+#	dspbptk - Dyson Sphere Program Blueprint Toolkit
+#	Copyright (C) 2024 Alan Ray
+#
+#	This file is part of dspbptk.
+#
+#	dspbptk is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	dspbptk is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+# Canonical content fingerprint of a blueprint's buildings. Two blueprints get the same fingerprint if they hold
+# the same buildings, regardless of the order of the buildings (and hence their indices) and of where the layout
+# sits relative to the anchor. Descriptions, icons, timestamps and the compressed framing are not part of it.
+
+import hashlib
+
+import numpy
+
+from .BuildingTable import hash_columns
+from .Graph import NO_OBJECT
+
+# Positions and yaws are compared in 1/1000 grid units (degrees) so float noise does not matter
+_QUANTUM = 1000
+
+_FIXED_FIELDS = [
+	"area_index", "item_id", "model_index", "recipe_id", "filter_id",
+	"output_to_slot", "input_from_slot", "output_from_slot", "input_to_slot", "output_offset", "input_offset",
+]
+
+def _quantize(values, origin = 0.0):
+	return numpy.round((values.astype(numpy.float64) - origin) * _QUANTUM).astype(numpy.int64)
+
+def _connected_hashes(table, object_indices, hashes):
+	# Replaces the object indices of connections by the content hash of the connected building
+	order = numpy.argsort(table["index"], kind = "stable")
+	sorted_indices = table["index"][order]
+	found = numpy.minimum(numpy.searchsorted(sorted_indices, object_indices), len(sorted_indices) - 1)
+	valid = (object_indices != NO_OBJECT) & (sorted_indices[found] == object_indices)
+	return numpy.where(valid, hashes[order[found]], numpy.uint64(0))
+
+def building_hashes(blueprint_data):
+	"""
+	Returns one 64-bit hash per building that does not depend on building order or translation: connections are
+	described by the content of the connected building instead of its index, and positions are relative to the
+	lowest building position.
+	"""
+	table = blueprint_data.building_table
+	if len(table) == 0:
+		return numpy.zeros(0, dtype = numpy.uint64)
+	origin_x = float(table["local_offset_x"].min())
+	origin_y = float(table["local_offset_y"].min())
+	columns = [ table[field] for field in _FIXED_FIELDS ] + [
+		_quantize(table["local_offset_x"], origin_x), _quantize(table["local_offset_y"], origin_y), _quantize(table["local_offset_z"]),
+		_quantize(table["local_offset_x2"], origin_x), _quantize(table["local_offset_y2"], origin_y), _quantize(table["local_offset_z2"]),
+		_quantize(table["yaw"]), _quantize(table["yaw2"]),
+		table.parameter_hashes(),
+	]
+	content = hash_columns(columns)
+	return hash_columns([ _connected_hashes(table, table["output_object_index"], content), _connected_hashes(table, table["input_object_index"], content) ], content)
+
+def fingerprint(blueprint_data):
+	"""
+	Returns the canonical fingerprint of the buildings as a hex string.
+	"""
+	hashes = numpy.sort(building_hashes(blueprint_data))
+	return hashlib.sha256(hashes.astype("<u8").tobytes()).hexdigest()
@@ -0,0 +1,195 @@
+#	dspbptk - Dyson Sphere Program Blueprint Toolkit
+#	Copyright (C) 2024 Alan Ray
+#
+#	This file is part of dspbptk.
+#
+#	dspbptk is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	dspbptk is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import numpy
+
+from .BlueprintData import CONVEYORS
+
+NO_OBJECT = 0xffffffff
+
+class ConnectivityGraph():
+	"""
+	Directed graph of how buildings feed each other, built from the output/input object indices of the buildings.
+	Nodes are positions in the building list. Edges are stored CSR-style: the successors of node i are
+	successors[successor_offsets[i] : successor_offsets[i + 1]] (and likewise for predecessors).
+	"""
+	def __init__(self, node_count, sources, targets, from_slots, to_slots, is_belt):
+		self._node_count = node_count
+		self._sources = sources
+		self._targets = targets
+		self._from_slots = from_slots
+		self._to_slots = to_slots
+		self._is_belt = is_belt
+		(self._successor_offsets, self._successor_edges) = self._compress(sources, node_count)
+		(self._predecessor_offsets, self._predecessor_edges) = self._compress(targets, node_count)
+
+	@staticmethod
+	def _compress(nodes, node_count):
+		# Offsets come from the per-node edge counts; the stable sort keeps each node's edges in their original order
+		offsets = numpy.zeros(node_count + 1, dtype = numpy.int64)
+		numpy.cumsum(numpy.bincount(nodes, minlength = node_count), out = offsets[1:])
+		edges = numpy.argsort(nodes, kind = "stable")
+		return (offsets, edges)
+
+	@classmethod
+	def from_blueprint_data(cls, blueprint_data):
+		columns = { fieldname: numpy.array(blueprint_data.column(fieldname), dtype = numpy.int64) for fieldname in [
+			"index", "item_id", "output_object_index", "input_object_index",
+			"output_from_slot", "output_to_slot", "input_from_slot", "input_to_slot",
+		] }
+		node_count = len(columns["index"])
+		if node_count == 0:
+			empty = numpy.zeros(0, dtype = numpy.int64)
+			return cls(0, empty, empty, empty, empty, numpy.zeros(0, dtype = bool))
+
+		# Object indices refer to the index field of a building, not its position in the list
+		order = numpy.argsort(columns["index"], kind = "stable")
+		sorted_indices = columns["index"][order]
+		def positions_of(object_indices):
+			found = numpy.minimum(numpy.searchsorted(sorted_indices, object_indices), node_count - 1)
+			valid = (object_indices != NO_OBJECT) & (sorted_indices[found] == object_indices)
+			return (order[found], valid)
+
+		nodes = numpy.arange(node_count)
+		(output_targets, has_output) = positions_of(columns["output_object_index"])
+		(input_sources, has_input) = positions_of(columns["input_object_index"])
+
+		sources = numpy.concatenate((nodes[has_output], input_sources[has_input]))
+		targets = numpy.concatenate((output_targets[has_output], nodes[has_input]))
+		from_slots = numpy.concatenate((columns["output_from_slot"][has_output], columns["input_from_slot"][has_input]))
+		to_slots = numpy.concatenate((columns["output_to_slot"][has_output], columns["input_to_slot"][has_input]))
+
+		# Both ends of a connection may describe it; keep each (source, target) pair once
+		(_, unique_edges) = numpy.unique((sources * node_count) + targets, return_index = True)
+		unique_edges.sort()
+		is_belt = numpy.isin(columns["item_id"], [ int(item) for item in CONVEYORS ])
+		return cls(node_count, sources[unique_edges], targets[unique_edges], from_slots[unique_edges], to_slots[unique_edges], is_belt)
+
+	@property
+	def node_count(self):
+		return self._node_count
+
+	@property
+	def edge_count(self):
+		return len(self._sources)
+
+	def successors(self, node):
+		return self._targets[self._successor_edges[self._successor_offsets[node] : self._successor_offsets[node + 1]]]
+
+	def predecessors(self, node):
+		return self._sources[self._predecessor_edges[self._predecessor_offsets[node] : self._predecessor_offsets[node + 1]]]
+
+	def edges(self):
+		"""
+		Returns (source, target, from_slot, to_slot) arrays of all connections.
+		"""
+		return (self._sources, self._targets, self._from_slots, self._to_slots)
+
+	def connected_components(self):
+		"""
+		Returns a component label per node; nodes are in the same component if they are connected in either direction.
+		"""
+		labels = [ -1 ] * self._node_count
+		successors = self._successor_lists()
+		predecessors = self._predecessor_lists()
+		label = 0
+		for start in range(self._node_count):
+			if labels[start] != -1:
+				continue
+			labels[start] = label
+			stack = [ start ]
+			while stack:
+				node = stack.pop()
+				for neighbor in successors[node] + predecessors[node]:
+					if labels[neighbor] == -1:
+						labels[neighbor] = label
+						stack.append(neighbor)
+			label += 1
+		return numpy.array(labels, dtype = numpy.int64)
+
+	def _successor_lists(self):
+		targets = self._targets[self._successor_edges].tolist()
+		offsets = self._successor_offsets.tolist()
+		return [ targets[offsets[node] : offsets[node + 1]] for node in range(self._node_count) ]
+
+	def _predecessor_lists(self):
+		sources = self._sources[self._predecessor_edges].tolist()
+		offsets = self._predecessor_offsets.tolist()
+		return [ sources[offsets[node] : offsets[node + 1]] for node in range(self._node_count) ]
+
+	def belt_chains(self):
+		"""
+		Compresses belts into chains: maximal runs of belts where each belt feeds exactly one belt and is fed by exactly
+		one belt. Sorters taking from or putting onto a belt do not break a chain. Returns a list of node lists in
+		belt order; a closed belt loop is returned as one chain starting at an arbitrary belt.
+		"""
+		is_belt = self._is_belt.tolist()
+		belt_successors = [ [ target for target in targets if is_belt[target] ] if is_belt[node] else [ ] for (node, targets) in enumerate(self._successor_lists()) ]
+		belt_predecessors = [ [ source for source in sources if is_belt[source] ] if is_belt[node] else [ ] for (node, sources) in enumerate(self._predecessor_lists()) ]
+
+		def continues_chain(node):
+			return (len(belt_predecessors[node]) == 1) and (len(belt_successors[belt_predecessors[node][0]]) == 1)
+
+		chains = [ ]
+		visited = [ False ] * self._node_count
+		def follow(node):
+			chain = [ node ]
+			visited[node] = True
+			while (len(belt_successors[node]) == 1) and continues_chain(belt_successors[node][0]) and not visited[belt_successors[node][0]]:
+				node = belt_successors[node][0]
+				chain.append(node)
+				visited[node] = True
+			return chain
+
+		for node in range(self._node_count):
+			if is_belt[node] and not continues_chain(node):
+				chains.append(follow(node))
+		# Whatever is left are closed loops of belts
+		for node in range(self._node_count):
+			if is_belt[node] and not visited[node]:
+				chains.append(follow(node))
+		return chains
+
+	def find_cycle(self):
+		"""
+		Returns the nodes of one directed cycle in order, or None if the graph is acyclic.
+		"""
+		successors = self._successor_lists()
+		# 0: unvisited, 1: on the current path, 2: done
+		state = [ 0 ] * self._node_count
+		for start in range(self._node_count):
+			if state[start] != 0:
+				continue
+			path = [ start ]
+			iterators = [ iter(successors[start]) ]
+			state[start] = 1
+			while path:
+				neighbor = next(iterators[-1], None)
+				if neighbor is None:
+					state[path.pop()] = 2
+					iterators.pop()
+				elif state[neighbor] == 1:
+					return path[path.index(neighbor) : ]
+				elif state[neighbor] == 0:
+					state[neighbor] = 1
+					path.append(neighbor)
+					iterators.append(iter(successors[neighbor]))
+		return None
+
+	def has_cycle(self):
+		return self.find_cycle() is not None
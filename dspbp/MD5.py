@@ -20,9 +20,12 @@
 
 import re
 import math
+import struct
 import collections
 import enum
 
+import numpy
+
 class DysonSphereMD5():
 	class Variant(enum.IntEnum):
 		Original = 0
@@ -136,6 +139,7 @@ class DysonSphereMD5():
 			34: _RoundOp(a = 2, b = 3, c = 0, d = 1, k = 11, s = 16, i = 35, T = 0x6d9d6121, op = _h),
 		},
 	}
+	_BLOCK_STRUCT = struct.Struct("<16L")
 	_INIT_VALUES = {
 		Variant.Original: (
 			int.from_bytes(bytes.fromhex("01 23 45 67"), byteorder = "little"),
@@ -157,59 +161,172 @@ class DysonSphereMD5():
 		),
 	}
 
+	# Inlined equivalents of _f, _g, _h and _i used by the generated compressors
+	_OP_EXPRESSIONS = {
+		"_f": "(({b} & {c}) | (~{b} & {d}))",
+		"_g": "(({b} & {d}) | ({c} & ~{d}))",
+		"_h": "({b} ^ {c} ^ {d})",
+		"_i": "({c} ^ ({b} | ~{d}))",
+	}
+	_COMPRESSORS = { }
+	_LANE_COMPRESSORS = { }
+
 	def __init__(self, variant = Variant.Original):
 		(self._a, self._b, self._c, self._d) = self._INIT_VALUES[variant]
 		self._buffer = bytearray()
 		self._digest = None
 		self._length = 0
-		self._patches = self._ROUND_OP_PATCHES.get(variant, { })
+		self._compress = self._get_compressor(variant)
+
+	@classmethod
+	def _round_ops(cls, variant):
+		patches = cls._ROUND_OP_PATCHES.get(variant, { })
+		return [ patches.get(i, round_op) for (i, round_op) in enumerate(cls._ROUND_OPS) ]
+
+	@classmethod
+	def _generate_rounds(cls, variant, indent, mask):
+		state = [ "a", "b", "c", "d" ]
+		lines = [ ]
+		for round_op in cls._round_ops(variant):
+			(a, b, c, d) = (state[round_op.a], state[round_op.b], state[round_op.c], state[round_op.d])
+			op_expression = cls._OP_EXPRESSIONS[round_op.op.__name__].format(b = b, c = c, d = d)
+			lines.append(indent + mask("%s + %s + x%d + 0x%08x" % (a, op_expression, round_op.k, round_op.T), "t"))
+			lines.append(indent + mask("%s + %s" % (b, mask("(t << %d) | (t >> %d)" % (round_op.s, 32 - round_op.s))), a))
+		return lines
+
+	@classmethod
+	def _generate_compressor_source(cls, variant):
+		"""
+		Generates the source of a fully unrolled compression function for the given variant. The function
+		compresses all 64 byte blocks of data[start : end] and returns the new (a, b, c, d) state.
+		"""
+		def mask(expression, target = None):
+			expression = "(%s) & 0xffffffff" % (expression)
+			return expression if target is None else "%s = %s" % (target, expression)
+
+		lines = [
+			"def compress(state, data, start, end):",
+			"	(a0, b0, c0, d0) = state",
+			"	for offset in range(start, end, 64):",
+			"		(%s) = unpack_from(data, offset)" % (", ".join("x%d" % (k) for k in range(16))),
+			"		(a, b, c, d) = (a0, b0, c0, d0)",
+		]
+		lines += cls._generate_rounds(variant, "\t\t", mask)
+		lines += [
+			"		a0 = (a0 + a) & 0xffffffff",
+			"		b0 = (b0 + b) & 0xffffffff",
+			"		c0 = (c0 + c) & 0xffffffff",
+			"		d0 = (d0 + d) & 0xffffffff",
+			"	return (a0, b0, c0, d0)",
+		]
+		return "\n".join(lines) + "\n"
+
+	@classmethod
+	def _generate_lane_compressor_source(cls, variant):
+		"""
+		Generates the source of a compression function that operates on numpy uint32 lanes. The function
+		compresses a single block per lane, with x being a (16, lanes) array of message words. No masking is
+		required because uint32 arithmetic wraps around by itself.
+		"""
+		def wrap(expression, target = None):
+			expression = "(%s)" % (expression)
+			return expression if target is None else "%s = %s" % (target, expression)
+
+		lines = [
+			"def compress(state, x):",
+			"	(a0, b0, c0, d0) = state",
+			"	(%s) = x" % (", ".join("x%d" % (k) for k in range(16))),
+			"	(a, b, c, d) = (a0, b0, c0, d0)",
+		]
+		lines += cls._generate_rounds(variant, "\t", wrap)
+		lines += [
+			"	return (a0 + a, b0 + b, c0 + c, d0 + d)",
+		]
+		return "\n".join(lines) + "\n"
+
+	@classmethod
+	def _compile(cls, source, name, namespace):
+		exec(compile(source, "<DysonSphereMD5 %s>" % (name), "exec"), namespace)
+		return namespace["compress"]
+
+	@classmethod
+	def _get_compressor(cls, variant):
+		compressor = cls._COMPRESSORS.get(variant)
+		if compressor is None:
+			namespace = { "unpack_from": cls._BLOCK_STRUCT.unpack_from }
+			compressor = cls._compile(cls._generate_compressor_source(variant), "%s compressor" % (variant.name), namespace)
+			cls._COMPRESSORS[variant] = compressor
+		return compressor
+
+	@classmethod
+	def _get_lane_compressor(cls, variant):
+		compressor = cls._LANE_COMPRESSORS.get(variant)
+		if compressor is None:
+			compressor = cls._compile(cls._generate_lane_compressor_source(variant), "%s lane compressor" % (variant.name), { })
+			cls._LANE_COMPRESSORS[variant] = compressor
+		return compressor
 
 	def _update_block(self, block):
 		assert(len(block) == 64)
-		state = [ self._a, self._b, self._c, self._d ]
-		x = [ int.from_bytes(block[4 * i : 4 * (i + 1)], byteorder = "little") for i in range(16) ]
-
-		for (i, round_op) in enumerate(self._ROUND_OPS):
-			if i in self._patches:
-				round_op = self._patches[i]
-			a = state[round_op.a]
-			b = state[round_op.b]
-			c = state[round_op.c]
-			d = state[round_op.d]
-			state[round_op.a] = b + self._rol((a + round_op.op(b, c, d) + x[round_op.k] + round_op.T) & 0xffffffff, round_op.s)
-		self._a = (self._a + state[0]) & 0xffffffff
-		self._b = (self._b + state[1]) & 0xffffffff
-		self._c = (self._c + state[2]) & 0xffffffff
-		self._d = (self._d + state[3]) & 0xffffffff
+		(self._a, self._b, self._c, self._d) = self._compress((self._a, self._b, self._c, self._d), block, 0, 64)
 
 	def _update(self, data, count_length = True):
 		assert(self._digest is None)
+		data = memoryview(data).cast("B")
 		if count_length:
 			self._length += len(data)
-		self._buffer += data
-		while len(self._buffer) >= 64:
-			block = self._buffer[:64]
-			self._buffer = self._buffer[64:]
-			self._update_block(block)
+
+		# Complete a previously buffered partial block first
+		offset = 0
+		if len(self._buffer) > 0:
+			offset = min(64 - len(self._buffer), len(data))
+			self._buffer += data[:offset]
+			if len(self._buffer) < 64:
+				return self
+			self._update_block(self._buffer)
+			self._buffer.clear()
+
+		# Compress all remaining full blocks in-place and only keep the tail
+		end = offset + ((len(data) - offset) // 64 * 64)
+		if end > offset:
+			(self._a, self._b, self._c, self._d) = self._compress((self._a, self._b, self._c, self._d), data, offset, end)
+		self._buffer += data[end:]
 		return self
 
 	def update(self, data):
+		"""
+		Hashes any bytes-like object (bytes, bytearray, memoryview, mmap, ...) without copying it.
+		"""
 		return self._update(data)
 
-	def _finalize(self):
-		if self._digest is not None:
-			return
+	def update_file(self, f, chunk_size = 1024 * 1024):
+		"""
+		Hashes the remaining content of a binary file object, reading it in chunks of chunk_size bytes.
+		"""
+		chunk = bytearray(chunk_size)
+		view = memoryview(chunk)
+		while True:
+			length = f.readinto(chunk)
+			if not length:
+				break
+			self._update(view[:length])
+		return self
 
-		# Add padding
-		padding_len = (64 - (self._length % 64) - 8) % 64
+	@staticmethod
+	def _padding(length):
+		"""
+		Returns the padding and length suffix that is appended to a message of the given length.
+		"""
+		padding_len = (64 - (length % 64) - 8) % 64
 		if padding_len == 0:
 			padding_len = 64
-		self._update(bytes([ 0x80 ]), count_length = False)
-		self._update(bytes([ 0 ] * (padding_len - 1)), count_length = False)
+		return bytes([ 0x80 ]) + bytes(padding_len - 1) + int.to_bytes(length * 8, length = 8, byteorder = "little")
 
-		# Add length
-		length_bits = int.to_bytes(self._length * 8, length = 8, byteorder = "little")
-		self._update(length_bits, count_length = False)
+	def _finalize(self):
+		if self._digest is not None:
+			return
+
+		self._update(self._padding(self._length), count_length = False)
 
 		# Concatenate digest
 		self._digest = b"".join(int.to_bytes(x, length = 4, byteorder = "little") for x in [ self._a, self._b, self._c, self._d ])
@@ -221,6 +338,57 @@ class DysonSphereMD5():
 	def hexdigest(self):
 		return self.digest().hex()
 
+	@classmethod
+	def digest_many(cls, messages, variant = Variant.Original, min_lanes = 8):
+		"""
+		Computes the digests of many independent messages at once. Every message is a lane of numpy uint32
+		state; all lanes that still have blocks left are compressed together. Lanes are sorted by length so
+		that the active lanes always form a prefix. Once fewer than min_lanes lanes remain active, the
+		remaining blocks are compressed one lane at a time.
+		"""
+		if len(messages) == 0:
+			return [ ]
+		paddings = [ cls._padding(len(message)) for message in messages ]
+		data = b"".join(part for message_padding in zip(messages, paddings) for part in message_padding)
+		words = numpy.frombuffer(data, dtype = "<u4")
+		block_counts = numpy.array([ (len(message) + len(padding)) // 64 for (message, padding) in zip(messages, paddings) ], dtype = numpy.int64)
+		word_offsets = numpy.zeros(len(messages), dtype = numpy.int64)
+		numpy.cumsum(block_counts[:-1] * 16, out = word_offsets[1:])
+
+		order = numpy.argsort(-block_counts, kind = "stable")
+		block_counts = block_counts[order]
+		word_offsets = word_offsets[order]
+		state = [ numpy.full(len(messages), value, dtype = numpy.uint32) for value in cls._INIT_VALUES[variant] ]
+
+		lane_compress = cls._get_lane_compressor(variant)
+		word_index = numpy.arange(16, dtype = numpy.int64)[:, None]
+		block = 0
+		while block < block_counts[0]:
+			active = int(numpy.count_nonzero(block_counts > block))
+			if active < min_lanes:
+				break
+			x = words[word_index + (word_offsets[:active] + (16 * block))[None, :]]
+			result = lane_compress([ lane_state[:active] for lane_state in state ], x)
+			for (lane_state, value) in zip(state, result):
+				lane_state[:active] = value
+			block += 1
+
+		# Finish the few lanes left over with the scalar compressor
+		compress = cls._get_compressor(variant)
+		for lane in range(int(numpy.count_nonzero(block_counts > block))):
+			start = 4 * int(word_offsets[lane])
+			lane_result = compress(tuple(int(lane_state[lane]) for lane_state in state), data, start + (64 * block), start + (64 * int(block_counts[lane])))
+			for (lane_state, value) in zip(state, lane_result):
+				lane_state[lane] = value
+
+		digests = numpy.empty((len(messages), 4), dtype = "<u4")
+		digests[order] = numpy.stack(state, axis = 1)
+		return [ row.tobytes() for row in digests ]
+
+	@classmethod
+	def hexdigest_many(cls, messages, variant = Variant.Original, min_lanes = 8):
+		return [ digest.hex() for digest in cls.digest_many(messages, variant = variant, min_lanes = min_lanes) ]
+
 	@classmethod
 	def _generate_block(cls, op, round_text):
 		regex = re.compile(r"\[(?P<order>[A-D]{4})\s+(?P<k>\d+)\s+(?P<s>\d+)\s+(?P<i>\d+)\]")
@@ -285,5 +453,5 @@ if __name__ == "__main__":
 	else:
 		md = DysonSphereMD5(variant = DysonSphereMD5.Variant.MD5F)
 		with open(sys.argv[1], "rb") as f:
-			md.update(f.read())
+			md.update_file(f)
 		print(md.hexdigest())
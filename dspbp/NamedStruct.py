@@ -28,10 +28,20 @@ import struct
 
 class NamedStruct():
 	def __init__(self, fields, struct_extra = "<"):
+		self._fields = fields
 		struct_format = struct_extra + ("".join(fieldtype for (fieldtype, fieldname) in fields))
 		self._struct = struct.Struct(struct_format)
 		self._collection = collections.namedtuple("Fields", [ fieldname for (fieldtype, fieldname) in fields ])
 
+	@property
+	def fields(self):
+		return self._fields
+
+	def offset_of(self, fieldname):
+		fieldnames = [ name for (fieldtype, name) in self._fields ]
+		preceding_types = "".join(fieldtype for (fieldtype, name) in self._fields[ : fieldnames.index(fieldname)])
+		return struct.calcsize(self._struct.format[0] + preceding_types)
+
 	@property
 	def size(self):
 		return self._struct.size
@@ -40,13 +50,22 @@ class NamedStruct():
 		fields = self._collection(**data)
 		return self._struct.pack(*fields)
 
+	def pack_into(self, buffer, offset, data):
+		fields = self._collection(**data)
+		self._struct.pack_into(buffer, offset, *fields)
+
 	def unpack(self, data):
 		values = self._struct.unpack(data)
 		fields = self._collection(*values)
 		return fields
 
+	def unpack_from(self, data, offset = 0):
+		values = self._struct.unpack_from(data, offset)
+		fields = self._collection(*values)
+		return fields
+
 	def unpack_head(self, data, offset = 0):
-		return self.unpack(data[offset : offset + self._struct.size])
+		return self.unpack_from(data, offset)
 
 	def unpack_from_file(self, f, at_offset = None):
 		if at_offset is not None:
@@ -18,6 +18,8 @@
 import collections
 import enum
 
+import numpy
+
 from .Enums import Recipe, DysonSphereItem as dsi, ProductCategory, ProliferationEffect
 
 
@@ -124,29 +126,124 @@ class RecipeDetails:
 
 class ItemProduction:
     """
-    Represents a collection
+    Production (positive) and consumption (negative) rates per item. Amounts are held in a dense vector with one
+    slot per item; items() reports the items that were touched, in the order they were first touched.
     """
+    # Slot of every item; items that are not DysonSphereItems get a slot when first seen
+    _SLOTS = { item: slot for slot, item in enumerate(dsi) }
+    _ITEMS = list(dsi)
+
     def __init__(self, collection=None):
-        self._items = collection or {}
+        self._amounts = numpy.zeros(len(self._ITEMS))
+        self._present = numpy.zeros(len(self._ITEMS), dtype=bool)
+        self._order = []
+        if collection:
+            for item, amount in collection.items():
+                slot = self._slot(item)
+                self._touch(slot)
+                self._amounts[slot] += amount
+
+    @classmethod
+    def _slot(cls, item):
+        slot = cls._SLOTS.get(item)
+        if slot is None:
+            slot = cls._SLOTS[item] = len(cls._ITEMS)
+            cls._ITEMS.append(item)
+        return slot
+
+    def _grow(self):
+        # Another instance may have added slots for new items
+        missing = len(self._ITEMS) - len(self._amounts)
+        if missing > 0:
+            self._amounts = numpy.concatenate((self._amounts, numpy.zeros(missing)))
+            self._present = numpy.concatenate((self._present, numpy.zeros(missing, dtype=bool)))
+
+    def _touch(self, slot):
+        self._grow()
+        if not self._present[slot]:
+            self._present[slot] = True
+            self._order.append(slot)
+
+    @property
+    def amounts(self):
+        """Dense vector of the amounts, indexed by item slot"""
+        self._grow()
+        return self._amounts
+
+    @classmethod
+    def from_amounts(cls, amounts, items):
+        """Production with the given dense amounts vector, reporting the given items (in this order)"""
+        result = cls()
+        result._grow()
+        result._amounts[:len(amounts)] = amounts
+        for item in items:
+            result._touch(cls._slot(item))
+        return result
+
+    @classmethod
+    def total(cls, productions):
+        """Sums many productions, e.g. those of a whole library, one vector addition each"""
+        result = cls()
+        for production in productions:
+            result += production
+        return result
 
     def items(self):
-        return self._items.items()
+        amounts = self._amounts.tolist()
+        return [(self._ITEMS[slot], amounts[slot]) for slot in self._order]
+
+    def __contains__(self, item):
+        slot = self._SLOTS.get(item)
+        return slot is not None and slot < len(self._present) and bool(self._present[slot])
+
+    def __getitem__(self, item):
+        if item not in self:
+            raise KeyError(item)
+        return float(self._amounts[self._SLOTS[item]])
+
+    def __delitem__(self, item):
+        if item not in self:
+            raise KeyError(item)
+        slot = self._SLOTS[item]
+        self._amounts[slot] = 0
+        self._present[slot] = False
+        self._order.remove(slot)
+
+    def __len__(self):
+        return len(self._order)
+
+    def _merge_order(self, other):
+        self._order += [slot for slot in other._order if not self._present[slot]]
+        self._present[other._order] = True
+
+    def _combine(self, other, sign):
+        if not isinstance(other, ItemProduction):
+            other = ItemProduction(other)
+        self._grow()
+        other._grow()
+        self._amounts += sign * other._amounts
+        self._merge_order(other)
+        return self
+
+    def copy(self):
+        result = ItemProduction()
+        self._grow()
+        result._amounts = self._amounts.copy()
+        result._present = self._present.copy()
+        result._order = list(self._order)
+        return result
+
+    def __iadd__(self, a):
+        return self._combine(a, 1)
+
+    def __isub__(self, a):
+        return self._combine(a, -1)
 
     def __add__(self, a):
-        b = collections.defaultdict(int)
-        for item, amount in self.items():
-            b[item] = amount
-        for item, amount in a.items():
-            b[item] += amount
-        return ItemProduction(b)
+        return self.copy()._combine(a, 1)
 
     def __sub__(self, a):
-        b = collections.defaultdict(int)
-        for item, amount in self.items():
-            b[item] = amount
-        for item, amount in a.items():
-            b[item] -= amount
-        return ItemProduction(b)
+        return self.copy()._combine(a, -1)
 
     def __str__(self):
         entries = [[amount, item] for item, amount in self.items()]
@@ -282,6 +379,88 @@ RECIPE_MAP = {
     Recipe.OrganicCrystal : RecipeDetails({ dsi.Plastic : 2, dsi.RefinedOil: 1, dsi.Water: 1}, { dsi.OrganicCrystal : 8}, 6),
 }
 
+class RecipeMatrix:
+    """
+    RECIPE_MAP compiled into dense recipes x items rate matrices: inputs[row, slot] and outputs[row, slot] are the
+    items per second of one machine with production multiplier 1, with item slots as in ItemProduction. The
+    production of any number of (machine, recipe) groups is then a product of per-recipe weights with the matrices.
+    """
+    def __init__(self, recipe_map):
+        self.recipes = list(recipe_map)
+        self.rows = { recipe: row for row, recipe in enumerate(self.recipes) }
+        for details in recipe_map.values():
+            for item in list(details.inputs) + list(details.outputs):
+                ItemProduction._slot(item)
+        slot_count = len(ItemProduction._ITEMS)
+        self.inputs = numpy.zeros((len(self.recipes), slot_count))
+        self.outputs = numpy.zeros((len(self.recipes), slot_count))
+        self._input_items = []
+        self._output_items = []
+        for row, details in enumerate(recipe_map.values()):
+            for item, amount in details.inputs.items():
+                self.inputs[row, ItemProduction._slot(item)] = amount / details.period
+            for item, amount in details.outputs.items():
+                self.outputs[row, ItemProduction._slot(item)] = amount / details.period
+            self._input_items.append(list(details.inputs))
+            self._output_items.append(list(details.outputs))
+
+        # Production multiplier per machine (by item slot), and proliferator factors per proliferator
+        self.machine_multipliers = numpy.full(slot_count, numpy.nan)
+        for machine_id, machine in Machine.registry.items():
+            self.machine_multipliers[ItemProduction._slot(machine_id)] = machine.production_multiplier
+        self.product_factors = { None: 1, **PROLIFERATION_PRODUCT_MULTIPLIERS }
+        self.speedup_factors = { None: 1, **PROLIFERATION_PRODUCT_SPEEDUP }
+
+    def weights(self, groups, proliferate=None, proliferation_effects=None):
+        """
+        Returns (input_weights, output_weights), one weight per recipe row, for groups of
+        ((machine, recipe), machine count). proliferation_effects maps recipes to their ProliferationEffect; by
+        default, proliferation is extra products.
+        """
+        proliferation_effects = proliferation_effects or {}
+        input_weights = numpy.zeros(len(self.recipes))
+        output_weights = numpy.zeros(len(self.recipes))
+        if not groups:
+            return (input_weights, output_weights)
+        rows = numpy.array([self.rows[recipe] for (_, recipe), _ in groups])
+        # Unknown machines get an out of range slot rather than a new one in the shared item table
+        machines = numpy.array([ItemProduction._SLOTS.get(machine, len(self.machine_multipliers)) for (machine, _), _ in groups])
+        counts = numpy.array([count for _, count in groups], dtype=float)
+        speedup = numpy.array([proliferation_effects.get(recipe) == ProliferationEffect.Speedup for (_, recipe), _ in groups])
+
+        multipliers = numpy.full(len(machines), numpy.nan)
+        known = machines < len(self.machine_multipliers)
+        multipliers[known] = self.machine_multipliers[machines[known]]
+        if numpy.isnan(multipliers).any():
+            machine = groups[int(numpy.flatnonzero(numpy.isnan(multipliers))[0])][0][0]
+            raise KeyError(f'Unknown production multiple {getattr(machine, "name", machine)}')
+        machine_counts = multipliers * counts
+        speedup_factor = self.speedup_factors[proliferate]
+        numpy.add.at(input_weights, rows, machine_counts * numpy.where(speedup, speedup_factor, 1))
+        numpy.add.at(output_weights, rows, machine_counts * numpy.where(speedup, speedup_factor, self.product_factors[proliferate]))
+        return (input_weights, output_weights)
+
+    def rates(self, input_weights, output_weights):
+        """
+        Returns the (inputs, outputs) rates per item slot. Weights may also be stacked, one row per blueprint, to
+        get the rates of all of them in one matrix product.
+        """
+        return (input_weights @ self.inputs, output_weights @ self.outputs)
+
+    def touched_items(self, recipes):
+        """
+        Returns (input items, output items) of the recipes in order of first appearance, as ItemProduction would
+        report them after adding the recipes one by one.
+        """
+        inputs = {}
+        outputs = {}
+        for recipe in recipes:
+            inputs.update(dict.fromkeys(self._input_items[self.rows[recipe]]))
+            outputs.update(dict.fromkeys(self._output_items[self.rows[recipe]]))
+        return (list(inputs), list(outputs))
+
+RECIPE_MATRIX = RecipeMatrix(RECIPE_MAP)
+
 # Where do these definitions go?
 PRODUCT_CATEGORY_MAP = {
 	dsi.IronIngot : ProductCategory.Smelted,
@@ -0,0 +1,97 @@
+#	dspbptk - Dyson Sphere Program Blueprint Toolkit
+#	Copyright (C) 2024 Alan Ray
+#
+#	This file is part of dspbptk.
+#
+#	dspbptk is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	dspbptk is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import math
+
+import numpy
+
+class SpatialIndex():
+	"""
+	Uniform grid hash over the (local_offset_x, local_offset_y) positions of the buildings. Buildings are sorted by grid
+	cell and each cell's buildings are found through a CSR-style offsets array, so a query only looks at the cells
+	it overlaps. Results are building positions in the building list, in ascending order.
+	"""
+	def __init__(self, x, y, cell_size = 4.0):
+		self._x = numpy.asarray(x, dtype = numpy.float64)
+		self._y = numpy.asarray(y, dtype = numpy.float64)
+		self._cell_size = float(cell_size)
+		count = len(self._x)
+		(self._min_x, self._min_y) = (float(self._x.min()), float(self._y.min())) if count else (0.0, 0.0)
+		self._columns = (int((self._x.max() - self._min_x) // self._cell_size) + 1) if count else 1
+		self._rows = (int((self._y.max() - self._min_y) // self._cell_size) + 1) if count else 1
+
+		cells = (self._cell_x(self._x) * self._rows) + self._cell_y(self._y)
+		self._order = numpy.argsort(cells, kind = "stable")
+		self._offsets = numpy.zeros((self._columns * self._rows) + 1, dtype = numpy.int64)
+		numpy.cumsum(numpy.bincount(cells, minlength = self._columns * self._rows), out = self._offsets[1:])
+
+	@classmethod
+	def from_blueprint_data(cls, blueprint_data, cell_size = 4.0):
+		return cls(blueprint_data.column("local_offset_x"), blueprint_data.column("local_offset_y"), cell_size = cell_size)
+
+	def __len__(self):
+		return len(self._x)
+
+	def _cell_x(self, x):
+		return numpy.clip(((x - self._min_x) // self._cell_size).astype(numpy.int64), 0, self._columns - 1)
+
+	def _cell_y(self, y):
+		return numpy.clip(((y - self._min_y) // self._cell_size).astype(numpy.int64), 0, self._rows - 1)
+
+	def _candidates(self, min_x, min_y, max_x, max_y):
+		(first_column, last_column) = self._cell_x(numpy.array([ min_x, max_x ])).tolist()
+		(first_row, last_row) = self._cell_y(numpy.array([ min_y, max_y ])).tolist()
+		# The cells of one grid column are adjacent, so every column is a single slice
+		slices = [ self._order[self._offsets[(column * self._rows) + first_row] : self._offsets[(column * self._rows) + last_row + 1]] for column in range(first_column, last_column + 1) ]
+		return numpy.concatenate(slices) if slices else numpy.zeros(0, dtype = numpy.int64)
+
+	def in_box(self, min_x, min_y, max_x, max_y):
+		"""
+		Returns the buildings with min_x <= x <= max_x and min_y <= y <= max_y.
+		"""
+		if len(self) == 0 or max_x < self._min_x or max_y < self._min_y:
+			return numpy.zeros(0, dtype = numpy.int64)
+		candidates = self._candidates(min_x, min_y, max_x, max_y)
+		(x, y) = (self._x[candidates], self._y[candidates])
+		return numpy.sort(candidates[(x >= min_x) & (x <= max_x) & (y >= min_y) & (y <= max_y)])
+
+	def within(self, x, y, radius):
+		"""
+		Returns the buildings at most radius away from (x, y).
+		"""
+		candidates = self.in_box(x - radius, y - radius, x + radius, y + radius)
+		distances = numpy.hypot(self._x[candidates] - x, self._y[candidates] - y)
+		return candidates[distances <= radius]
+
+	def nearest(self, x, y, count = 1):
+		"""
+		Returns up to count buildings closest to (x, y), closest first. The search radius grows until it is certain
+		that no closer building lies outside of it.
+		"""
+		count = min(count, len(self))
+		if count == 0:
+			return numpy.zeros(0, dtype = numpy.int64)
+		# Distance from (x, y) to the farthest corner bounds the search
+		max_radius = math.hypot(max(abs(x - self._min_x), abs(x - (self._min_x + (self._columns * self._cell_size)))), max(abs(y - self._min_y), abs(y - (self._min_y + (self._rows * self._cell_size)))))
+		radius = self._cell_size
+		while True:
+			candidates = self.within(x, y, radius)
+			if (len(candidates) >= count) or (radius >= max_radius):
+				distances = numpy.hypot(self._x[candidates] - x, self._y[candidates] - y)
+				return candidates[numpy.argsort(distances, kind = "stable")[:count]]
+			radius *= 2
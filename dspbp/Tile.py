@@ -0,0 +1,84 @@
+#	dspbptk - Dyson Sphere Program Blueprint Toolkit
+#	Copyright (C) 2024 Alan Ray
+#
+#	This file is part of dspbptk.
+#
+#	dspbptk is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	dspbptk is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+# Tiling: repeats the buildings of a blueprint in a grid of copies, e.g. a row of 8 energy exchangers from a
+# blueprint holding one. All copies are built column-wise from the BuildingTable of the data.
+
+import numpy
+
+from .BlueprintData import BlueprintData, BlueprintArea
+from .BuildingTable import BuildingTable
+from .Graph import NO_OBJECT
+
+_POSITION_FIELDS = [ ("local_offset_x", "local_offset_y"), ("local_offset_x2", "local_offset_y2") ]
+
+def default_step(blueprint_data):
+	"""
+	Returns the (step_x, step_y) between copies that keeps them apart: the size of the area, which covers the
+	footprints of all buildings. Raises ValueError if the area has no size to go by.
+	"""
+	area = blueprint_data.areas[0].data
+	if (area.width < 1) or (area.height < 1):
+		raise ValueError(f'Area has no size ({area.width}x{area.height}) to space copies by, a step has to be given')
+	return (area.width, area.height)
+
+def tile(blueprint_data, columns, rows, step_x = None, step_y = None):
+	"""
+	Returns new data holding columns x rows copies of the buildings, copy (column, row) being moved by
+	(column * step_x, row * step_y) grid units. Each copy gets its own building indices and its connections are
+	remapped to them. The area grows to hold all copies.
+	"""
+	if (columns < 1) or (rows < 1):
+		raise ValueError(f'Cannot tile {columns}x{rows} copies')
+	if len(blueprint_data.areas) > 1:
+		raise ValueError('Tiling multi-area blueprints is not supported')
+	if (step_x is None) or (step_y is None):
+		(default_x, default_y) = default_step(blueprint_data)
+		step_x = default_x if step_x is None else step_x
+		step_y = default_y if step_y is None else step_y
+
+	table = blueprint_data.building_table
+	building_count = len(table)
+	copy_count = columns * rows
+	records = numpy.tile(table.records, copy_count)
+	parameters = numpy.tile(table.parameters, copy_count)
+
+	# Copies are laid out row by row; every building of a copy is moved by the same offset
+	copy_x = numpy.repeat(numpy.tile(numpy.arange(columns), rows) * step_x, building_count)
+	copy_y = numpy.repeat(numpy.repeat(numpy.arange(rows), columns) * step_y, building_count)
+	for (x_field, y_field) in _POSITION_FIELDS:
+		records[x_field] = records[x_field] + copy_x
+		records[y_field] = records[y_field] + copy_y
+
+	index_stride = (int(table["index"].max()) + 1) if building_count else 0
+	if (index_stride * copy_count) >= NO_OBJECT:
+		raise ValueError(f'Too many buildings for {copy_count} copies')
+	index_offset = numpy.repeat(numpy.arange(copy_count, dtype = numpy.int64) * index_stride, building_count)
+	records["index"] = records["index"] + index_offset
+	for field in [ "output_object_index", "input_object_index" ]:
+		connected = records[field] != NO_OBJECT
+		records[field][connected] = records[field][connected] + index_offset[connected]
+
+	areas = [ BlueprintArea(area.data._replace(width = area.data.width + ((columns - 1) * step_x), height = area.data.height + ((rows - 1) * step_y))) for area in blueprint_data.areas ]
+	for area in areas:
+		if max(area.data.width, area.data.height) > 0xffff:
+			raise ValueError(f'Tiled area is too large ({area.data.width}x{area.data.height})')
+	tiled = BlueprintData(blueprint_data.header, areas, building_table = BuildingTable(records, parameters))
+	tiled.mark_dirty()
+	return tiled
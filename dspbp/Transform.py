@@ -0,0 +1,145 @@
+#	dspbptk - Dyson Sphere Program Blueprint Toolkit
+#	Copyright (C) 2024 Alan Ray
+#
+#	This file is part of dspbptk.
+#
+#	dspbptk is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	dspbptk is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+# Geometric transforms of a whole blueprint. Building positions are relative to the anchor of their area, and the
+# anchor, cursor and area size are in whole grid units measured from the corner of the area. All building fields
+# are transformed column-wise on the BuildingTable of the data.
+#
+# Yaw is in degrees, clockwise, with 0 facing +y.
+
+import numpy
+
+from .Enums import DysonSphereItem as dsi
+
+POI_ITEMS = [ dsi.InterstellarLogisticsStation, dsi.PlanetaryLogisticsStation ]
+
+_POSITION_FIELDS = [ ("local_offset_x", "local_offset_y"), ("local_offset_x2", "local_offset_y2") ]
+_YAW_FIELDS = [ "yaw", "yaw2" ]
+
+def _column(table, field):
+	return table[field].astype(numpy.float64)
+
+def _cursor_area(blueprint_data):
+	target_area = blueprint_data.header.cursor_target_area
+	return blueprint_data.areas[target_area] if target_area < len(blueprint_data.areas) else None
+
+def _check_anchor(area, anchor_x, anchor_y):
+	if not ((0 <= anchor_x <= area.data.width) and (0 <= anchor_y <= area.data.height)):
+		raise ValueError(f'Transform moves the anchor of area {area.data.index} out of the area ({anchor_x}, {anchor_y})')
+
+def translate(blueprint_data, dx, dy):
+	"""
+	Moves all buildings by whole grid units relative to their area anchors. The anchors move the opposite way, so the
+	buildings keep their place within the area and only the point the blueprint is pasted at changes.
+	"""
+	if (dx != int(dx)) or (dy != int(dy)):
+		raise ValueError(f'Translation must be in whole grid units, not ({dx}, {dy})')
+	(dx, dy) = (int(dx), int(dy))
+	for area in blueprint_data.areas:
+		_check_anchor(area, area.data.anchor_local_offset_x - dx, area.data.anchor_local_offset_y - dy)
+
+	table = blueprint_data.building_table
+	for (x_field, y_field) in _POSITION_FIELDS:
+		table.assign(x_field, _column(table, x_field) + dx)
+		table.assign(y_field, _column(table, y_field) + dy)
+	for area in blueprint_data.areas:
+		area.replace(anchor_local_offset_x = area.data.anchor_local_offset_x - dx, anchor_local_offset_y = area.data.anchor_local_offset_y - dy)
+	blueprint_data.mark_dirty()
+
+def _rotate_quarter(blueprint_data):
+	# (x, y) -> (y, -x), i.e., a quarter turn clockwise
+	table = blueprint_data.building_table
+	for (x_field, y_field) in _POSITION_FIELDS:
+		(x, y) = (_column(table, x_field), _column(table, y_field))
+		table.assign(x_field, y)
+		table.assign(y_field, -x)
+	for field in _YAW_FIELDS:
+		table.assign(field, numpy.mod(_column(table, field) + 90, 360))
+
+	header = blueprint_data.header
+	cursor_area = _cursor_area(blueprint_data)
+	if cursor_area is not None:
+		blueprint_data.replace_header(cursor_offset_x = header.cursor_offset_y, cursor_offset_y = cursor_area.data.width - header.cursor_offset_x)
+	blueprint_data.replace_header(dragbox_size_x = header.dragbox_size_y, dragbox_size_y = header.dragbox_size_x)
+	for area in blueprint_data.areas:
+		fields = area.data
+		area.replace(anchor_local_offset_x = fields.anchor_local_offset_y, anchor_local_offset_y = fields.width - fields.anchor_local_offset_x, width = fields.height, height = fields.width)
+
+def rotate(blueprint_data, quarter_turns = 1):
+	"""
+	Rotates the blueprint clockwise by quarter_turns * 90 degrees.
+	"""
+	quarter_turns %= 4
+	if quarter_turns and (len(blueprint_data.areas) > 1):
+		raise ValueError('Rotating multi-area blueprints is not supported')
+	for _ in range(quarter_turns):
+		_rotate_quarter(blueprint_data)
+	blueprint_data.mark_dirty()
+
+def mirror(blueprint_data, axis = "x"):
+	"""
+	Mirrors the blueprint by negating the x (or y) coordinates. Buildings are mirrored in place, but of course
+	asymmetric buildings themselves are not.
+	"""
+	if axis not in ("x", "y"):
+		raise ValueError(f'Unknown mirror axis {axis}')
+	table = blueprint_data.building_table
+	for (x_field, y_field) in _POSITION_FIELDS:
+		field = x_field if axis == "x" else y_field
+		table.assign(field, -_column(table, field))
+	for field in _YAW_FIELDS:
+		# Mirroring x turns east into west; mirroring y turns north into south
+		table.assign(field, numpy.mod((0 if axis == "x" else 180) - _column(table, field), 360))
+
+	header = blueprint_data.header
+	cursor_area = _cursor_area(blueprint_data)
+	if cursor_area is not None:
+		if axis == "x":
+			blueprint_data.replace_header(cursor_offset_x = cursor_area.data.width - header.cursor_offset_x)
+		else:
+			blueprint_data.replace_header(cursor_offset_y = cursor_area.data.height - header.cursor_offset_y)
+	for area in blueprint_data.areas:
+		fields = area.data
+		if axis == "x":
+			area.replace(anchor_local_offset_x = fields.width - fields.anchor_local_offset_x)
+		else:
+			area.replace(anchor_local_offset_y = fields.height - fields.anchor_local_offset_y)
+	blueprint_data.mark_dirty()
+
+def find_poi(blueprint_data, item_ids = POI_ITEMS):
+	"""
+	Returns the (x, y) position of the first building of the first item in item_ids that is present, or None.
+	"""
+	index = blueprint_data.indices_by("item_id")
+	for item_id in item_ids:
+		if item_id in index:
+			building_index = index[item_id][0]
+			return (blueprint_data.column("local_offset_x")[building_index], blueprint_data.column("local_offset_y")[building_index])
+	return None
+
+def center_on(blueprint_data, x, y):
+	"""
+	Translates the blueprint so that (x, y), rounded to the grid, becomes the anchor.
+	"""
+	translate(blueprint_data, -round(x), -round(y))
+
+def center_on_poi(blueprint_data, item_ids = POI_ITEMS):
+	poi = find_poi(blueprint_data, item_ids)
+	if poi is None:
+		raise ValueError(f'Blueprint has no {' or '.join(item_id.name for item_id in item_ids)} to center on')
+	center_on(blueprint_data, *poi)
@@ -0,0 +1,131 @@
+#	dspbptk - Dyson Sphere Program Blueprint Toolkit
+#	Copyright (C) 2024 Alan Ray
+#
+#	This file is part of dspbptk.
+#
+#	dspbptk is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	dspbptk is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+# Recipe transposition: rewrites a blueprint built for one recipe into one for another recipe, e.g. iron smelting
+# into copper smelting. Recipes, filters, logistics station storage and belt memo icons are rewritten column-wise on
+# the BuildingTable of the data.
+
+import numpy
+
+from .BlueprintData import BlueprintData, CONVEYORS, PLANETARY_LOGISTICS_STATION_STORAGE_SIZE, INTERSTELLAR_LOGISTICS_STATION_STORAGE_SIZE
+from .Enums import DysonSphereItem as dsi
+from .Recipes import RECIPE_MAP, PRODUCT_CATEGORY_MAP
+
+# Storage entries are 6 parameters wide and start with the item id
+_STATION_STORAGE = {
+	dsi.PlanetaryLogisticsStation: PLANETARY_LOGISTICS_STATION_STORAGE_SIZE,
+	dsi.InterstellarLogisticsStation: INTERSTELLAR_LOGISTICS_STATION_STORAGE_SIZE,
+}
+_STORAGE_ENTRY_SIZE = 6
+
+def ingredient_map(source_recipe, target_recipe):
+	"""
+	Maps the outputs and inputs of source_recipe to those of target_recipe, pairing them in recipe order.
+	"""
+	source_details = RECIPE_MAP[source_recipe]
+	target_details = RECIPE_MAP[target_recipe]
+	mapping = { }
+	for (source_output, target_output) in zip(source_details.outputs, target_details.outputs):
+		mapping[source_output] = target_output
+	for (source_input, target_input) in zip(source_details.inputs, target_details.inputs):
+		mapping[source_input] = target_input
+	return mapping
+
+def sibling_recipes(recipe):
+	"""
+	Returns the recipes a blueprint for recipe can be transposed to: those whose primary output is in the same
+	product category and that have as many inputs and outputs, e.g. CopperIngot and TitaniumIngot for IronIngot.
+	"""
+	details = RECIPE_MAP[recipe]
+	category = PRODUCT_CATEGORY_MAP.get(next(iter(details.outputs)))
+	if category is None:
+		return [ ]
+	return [ sibling for (sibling, sibling_details) in RECIPE_MAP.items()
+		if (sibling != recipe) and (PRODUCT_CATEGORY_MAP.get(next(iter(sibling_details.outputs))) == category)
+			and (len(sibling_details.inputs) == len(details.inputs)) and (len(sibling_details.outputs) == len(details.outputs)) ]
+
+class _Lookup():
+	def __init__(self, mapping):
+		self._keys = numpy.array(sorted(int(key) for key in mapping), dtype = numpy.int64)
+		self._values = numpy.array([ int(mapping[key]) for key in sorted(mapping, key = int) ], dtype = numpy.int64)
+
+	def remap(self, values):
+		"""
+		Returns (positions, new values) of the values that are mapped.
+		"""
+		values = numpy.asarray(values, dtype = numpy.int64)
+		if len(self._keys) == 0:
+			return (numpy.zeros(0, dtype = numpy.int64), numpy.zeros(0, dtype = numpy.int64))
+		found = numpy.minimum(numpy.searchsorted(self._keys, values), len(self._keys) - 1)
+		positions = numpy.flatnonzero(self._keys[found] == values)
+		return (positions, self._values[found[positions]])
+
+def transpose(blueprint_data, source_recipe, target_recipe):
+	"""
+	Rewrites the buildings from source_recipe to target_recipe in place. All items are substituted at once, so
+	ingredients that swap places (or that appear in both recipes) are not substituted twice. Returns the number
+	of changed values.
+	"""
+	table = blueprint_data.building_table
+	items = _Lookup(ingredient_map(source_recipe, target_recipe))
+	changed = 0
+
+	where = numpy.flatnonzero(table["recipe_id"] == int(source_recipe))
+	if len(where):
+		table.assign("recipe_id", int(target_recipe), where)
+		changed += len(where)
+
+	(where, filters) = items.remap(table["filter_id"])
+	if len(where):
+		table.assign("filter_id", filters, where)
+		changed += len(where)
+
+	# Item ids held in the parameters: station storage and belt memo icons
+	item_column = table["item_id"]
+	starts = table.parameter_offsets[:-1]
+	counts = numpy.diff(table.parameter_offsets)
+	positions = [ ]
+	for (station, storage_size) in _STATION_STORAGE.items():
+		stations = numpy.flatnonzero((item_column == station) & (counts >= storage_size * _STORAGE_ENTRY_SIZE))
+		positions.append((starts[stations][:, None] + (numpy.arange(storage_size) * _STORAGE_ENTRY_SIZE)).ravel())
+	belts = numpy.flatnonzero(numpy.isin(item_column, [ int(conveyor) for conveyor in CONVEYORS ]) & (counts > 0))
+	positions.append(starts[belts])
+	positions = numpy.concatenate(positions)
+
+	(where, parameters) = items.remap(table.parameters[positions])
+	if len(where):
+		table.assign_parameters(positions[where], parameters)
+		changed += len(where)
+	blueprint_data.mark_dirty()
+	return changed
+
+def transpose_siblings(blueprint, source_recipe, target_recipes = None):
+	"""
+	Returns [ (recipe, blueprint) ] with one copy of the blueprint transposed to each of target_recipes (by default,
+	the siblings of source_recipe). The blueprint is decoded once and is itself unchanged.
+	"""
+	if target_recipes is None:
+		target_recipes = sibling_recipes(source_recipe)
+	data = BlueprintData.deserialize(blueprint.decoded_data.serialize(), columnar = True)
+	variants = [ ]
+	for target_recipe in target_recipes:
+		variant_data = BlueprintData(data.header, data.areas, building_table = data.building_table.copy())
+		transpose(variant_data, source_recipe, target_recipe)
+		variants.append((target_recipe, blueprint.copy_with_data(variant_data.serialize())))
+	return variants
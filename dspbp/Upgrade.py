@@ -0,0 +1,141 @@
+#	dspbptk - Dyson Sphere Program Blueprint Toolkit
+#	Copyright (C) 2024 Alan Ray
+#
+#	This file is part of dspbptk.
+#
+#	dspbptk is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	dspbptk is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+# Tier upgrades and downgrades of whole building classes. Tiers are numbered from 1 (e.g. ConveyorBeltMKI) and all
+# buildings of a class are re-tiered column-wise on the BuildingTable of the data.
+
+import collections
+
+import numpy
+
+from .BlueprintData import BlueprintData
+from .Enums import DysonSphereItem as dsi
+from .Recipes import Machine
+
+Tier = collections.namedtuple("Tier", [ "item", "model_index", "parameter_count" ])
+
+# The model index is the game's prefab index of the building; it is not derivable from the item id
+MODEL_INDICES = {
+	dsi.ConveyorBeltMKI: 35,
+	dsi.ConveyorBeltMKII: 36,
+	dsi.ConveyorBeltMKIII: 37,
+	dsi.SorterMKI: 41,
+	dsi.SorterMKII: 42,
+	dsi.SorterMKIII: 43,
+	dsi.ArcSmelter: 62,
+	dsi.ChemicalPlant: 64,
+	dsi.AssemblingMachineMkI: 65,
+	dsi.AssemblingMachineMkII: 66,
+	dsi.AssemblingMachineMkIII: 67,
+	dsi.PlaneSmelter: 194,
+	dsi.QuantumChemicalPlant: 376,
+}
+
+# Production machines hold their proliferation effect as the only parameter, but are sometimes stored without any
+PRODUCTION_PARAMETER_COUNT = 1
+
+def _machine_chain(item):
+	machine = Machine.registry[item]
+	while machine.downgrade_machine is not None:
+		machine = machine.downgrade_machine
+	chain = [ ]
+	while machine is not None:
+		chain.append(machine.machine_id)
+		machine = machine.upgrade_machine
+	return chain
+
+def _tiers(items, parameter_count = None):
+	return [ Tier(item, MODEL_INDICES[item], parameter_count) for item in items ]
+
+BUILDING_CLASSES = {
+	"belt": _tiers([ dsi.ConveyorBeltMKI, dsi.ConveyorBeltMKII, dsi.ConveyorBeltMKIII ]),
+	"sorter": _tiers([ dsi.SorterMKI, dsi.SorterMKII, dsi.SorterMKIII ]),
+	"assembler": _tiers(_machine_chain(dsi.AssemblingMachineMkI), PRODUCTION_PARAMETER_COUNT),
+	"smelter": _tiers(_machine_chain(dsi.ArcSmelter), PRODUCTION_PARAMETER_COUNT),
+	"chemical": _tiers(_machine_chain(dsi.ChemicalPlant), PRODUCTION_PARAMETER_COUNT),
+}
+
+ROMAN_TIERS = [ "I", "II", "III" ]
+
+def tier_count(building_class):
+	return len(BUILDING_CLASSES[building_class])
+
+def _tiers_of(building_class):
+	try:
+		return BUILDING_CLASSES[building_class]
+	except KeyError:
+		raise ValueError(f'Unknown building class {building_class}, can be one of {", ".join(BUILDING_CLASSES)}')
+
+def _retier(blueprint_data, tiers, new_tier):
+	"""
+	Moves every building of the class given by tiers to the (0-based) tier new_tier(current_tiers) and returns the
+	number of buildings of the class.
+	"""
+	table = blueprint_data.building_table
+	item_ids = numpy.array([ int(tier.item) for tier in tiers ], dtype = numpy.int64)
+	model_indices = numpy.array([ tier.model_index for tier in tiers ], dtype = numpy.int64)
+	item_column = table["item_id"].astype(numpy.int64)
+	where = numpy.flatnonzero(numpy.isin(item_column, item_ids))
+	if len(where) == 0:
+		return 0
+
+	order = numpy.argsort(item_ids)
+	current = order[numpy.searchsorted(item_ids, item_column[where], sorter = order)]
+	targets = new_tier(current)
+	table.assign("item_id", item_ids[targets], where)
+	table.assign("model_index", model_indices[targets], where)
+	# All tiers of a class share the parameter layout
+	if tiers[0].parameter_count is not None:
+		table.resize_parameters(where, tiers[0].parameter_count)
+	blueprint_data.mark_dirty()
+	return len(where)
+
+def set_tier(blueprint_data, building_class, tier):
+	"""
+	Sets all buildings of building_class to tier, e.g. set_tier(data, "belt", 3) turns all belts into
+	ConveyorBeltMKIII. Returns the number of buildings of the class.
+	"""
+	tiers = _tiers_of(building_class)
+	if not (1 <= tier <= len(tiers)):
+		raise ValueError(f'{building_class} has tiers 1 to {len(tiers)}, not {tier}')
+	return _retier(blueprint_data, tiers, lambda current: numpy.full(len(current), tier - 1))
+
+def shift_tier(blueprint_data, building_class, steps = 1):
+	"""
+	Upgrades (or, for negative steps, downgrades) every building of building_class by steps tiers, stopping at the
+	highest (lowest) tier. Returns the number of buildings of the class.
+	"""
+	tiers = _tiers_of(building_class)
+	return _retier(blueprint_data, tiers, lambda current: numpy.clip(current + steps, 0, len(tiers) - 1))
+
+def template_book(blueprint, building_classes):
+	"""
+	Returns one copy of the blueprint per tier, from MkI up to the highest tier of any of building_classes, with
+	the buildings of each class set to that tier (or the highest tier the class has). The buildings are decoded
+	only once and the short description of each copy is suffixed with its tier. The blueprint itself is unchanged.
+	"""
+	data = BlueprintData.deserialize(blueprint.decoded_data.serialize(), columnar = True)
+	book = [ ]
+	for tier in range(1, max(tier_count(building_class) for building_class in building_classes) + 1):
+		for building_class in building_classes:
+			set_tier(data, building_class, min(tier, tier_count(building_class)))
+		variant = blueprint.copy_with_data(data.serialize())
+		variant.short_desc = f'{blueprint.short_desc} Mk{ROMAN_TIERS[tier - 1]}'
+		book.append(variant)
+	return book
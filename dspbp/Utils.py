@@ -18,14 +18,12 @@
 
 from .Enums import DysonSphereItem, Recipe
 
+# Plain dict lookups; constructing the enum raises and catches ValueError for every unknown id
+_ITEMS_BY_ID = { item.value: item for item in DysonSphereItem }
+_RECIPES_BY_ID = { recipe.value: recipe for recipe in Recipe }
+
 def maybeDysonSphereItem(id_):
-	try:
-		return DysonSphereItem(id_)
-	except ValueError:
-		return None
+	return _ITEMS_BY_ID.get(id_)
 
 def maybeRecipe(id_):
-	try:
-		return Recipe(id_)
-	except ValueError:
-		return None
+	return _RECIPES_BY_ID.get(id_)
@@ -0,0 +1,47 @@
+import datetime
+
+from dspbp.Blueprint import Blueprint
+from dspbp.BlueprintData import BlueprintData, BlueprintArea, BlueprintBuilding
+from dspbp.Enums import DysonSphereItem as dsi, Recipe
+
+NO_OBJECT = 0xffffffff
+
+def make_building(index, item_id, model_index, x, y, recipe_id = 0, filter_id = 0, parameters = (), output_object_index = NO_OBJECT, input_object_index = NO_OBJECT, yaw = 0.0):
+    fields = BlueprintBuilding._BLUEPRINT_BUILDING._collection(
+        index = index, area_index = 0,
+        local_offset_x = x, local_offset_y = y, local_offset_z = 0.0,
+        local_offset_x2 = x, local_offset_y2 = y, local_offset_z2 = 0.0,
+        yaw = yaw, yaw2 = yaw,
+        item_id = item_id, model_index = model_index,
+        output_object_index = output_object_index, input_object_index = input_object_index,
+        output_to_slot = 1, input_from_slot = 0, output_from_slot = 0, input_to_slot = 1, output_offset = 0, input_offset = 0,
+        recipe_id = recipe_id, filter_id = filter_id, parameter_count = len(parameters))
+    return BlueprintBuilding(fields, list(parameters))
+
+def make_blueprint_data(belt_count = 20):
+    """
+    A small smelting blueprint: a logistics station, smelters, a belt line and sorters.
+    """
+    header = BlueprintData._HEADER._collection(version = 1, cursor_offset_x = 5, cursor_offset_y = 5, cursor_target_area = 0, dragbox_size_x = 1, dragbox_size_y = 1, primary_area_index = 0, area_count = 1)
+    area = BlueprintArea(BlueprintArea._BLUEPRINT_AREA._collection(index = 0, parent_index = -1, tropic_anchor = 0, area_segments = 200, anchor_local_offset_x = 5, anchor_local_offset_y = 5, width = 40, height = 30))
+
+    station_parameters = [ 0 ] * 2048
+    station_parameters[0:4] = [ dsi.IronOre, 2, 0, 5000 ]
+    station_parameters[6:10] = [ dsi.IronIngot, 1, 1, 5000 ]
+    station_parameters[192:194] = [ 1, 1 ]
+    station_parameters[320:328] = [ 1, 2, 3, 0, 4, 1, 10, 0 ]
+    buildings = [ make_building(0, dsi.PlanetaryLogisticsStation, 49, 0.0, 0.0, parameters = station_parameters) ]
+    for i in range(4):
+        buildings.append(make_building(len(buildings), dsi.ArcSmelter, 62, 5.0 + 3 * i, 4.0, recipe_id = Recipe.IronIngot, parameters = [ 0 ]))
+    first_belt = len(buildings)
+    for i in range(belt_count):
+        output_object_index = first_belt + i + 1 if i + 1 < belt_count else NO_OBJECT
+        parameters = [ dsi.IronIngot, 5 ] if i == 0 else [ ]
+        buildings.append(make_building(len(buildings), dsi.ConveyorBeltMKIII, 37, float(i), 2.0, parameters = parameters, output_object_index = output_object_index, yaw = 90.0))
+    for i in range(4):
+        buildings.append(make_building(len(buildings), dsi.SorterMKIII, 43, 5.0 + 3 * i, 3.0, output_object_index = 1 + i, input_object_index = first_belt + i))
+    return BlueprintData(header, [ area ], buildings)
+
+def make_blueprint(belt_count = 20, short_desc = "Synthetic"):
+    data = make_blueprint_data(belt_count).serialize()
+    return Blueprint(game_version = "0.10.30.22292", data = data, timestamp = datetime.datetime(2024, 1, 2, 3, 4, 5), short_desc = short_desc, long_desc = "Generated for tests")
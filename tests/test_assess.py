@@ -0,0 +1,49 @@
+import pytest
+
+from dspbp.Assess import Assessment
+from dspbp.Enums import DysonSphereItem as dsi, Recipe
+from dspbp.Recipes import RECIPE_MAP, RECIPE_MATRIX, ItemProduction
+from tests.synthetic import make_blueprint
+
+def test_recipe_matrix_matches_recipe_details():
+    groups = [ ((dsi.AssemblingMachineMkIII, Recipe.CircuitBoard), 4), ((dsi.AssemblingMachineMkI, Recipe.Gear), 3), ((dsi.ArcSmelter, Recipe.IronIngot), 10) ]
+    inputs = ItemProduction()
+    outputs = ItemProduction()
+    for ((machine, recipe), count) in groups:
+        inputs += RECIPE_MAP[recipe].calculate_inputs({ machine: count }, dsi.ProliferatorMkII)
+        outputs += RECIPE_MAP[recipe].calculate_outputs({ machine: count }, dsi.ProliferatorMkII)
+    (input_rates, output_rates) = RECIPE_MATRIX.rates(*RECIPE_MATRIX.weights(groups, dsi.ProliferatorMkII))
+    assert input_rates.tolist() == pytest.approx(inputs.amounts[:len(input_rates)].tolist())
+    assert output_rates.tolist() == pytest.approx(outputs.amounts[:len(output_rates)].tolist())
+
+def test_recipe_matrix_unknown_machine():
+    item_count = len(ItemProduction._ITEMS)
+    with pytest.raises(KeyError):
+        RECIPE_MATRIX.weights([ ((dsi.ConveyorBeltMKIII, Recipe.Gear), 1) ])
+    with pytest.raises(KeyError):
+        RECIPE_MATRIX.weights([ (('NoSuchMachine', Recipe.Gear), 1) ])
+    assert len(ItemProduction._ITEMS) == item_count
+    assert 'NoSuchMachine' not in ItemProduction._SLOTS
+
+def test_assess_all():
+    blueprints = [ make_blueprint(belt_count = 20), make_blueprint(belt_count = 5) ]
+    for (batched, blueprint) in zip(Assessment.assess_all(blueprints), blueprints):
+        single = Assessment(blueprint)
+        assert batched.inputs == single.inputs == { dsi.IronOre: 4.0 }
+        assert batched.outputs == single.outputs == { dsi.IronIngot: 4.0 }
+        assert batched.primary_output_id == dsi.IronIngot
+
+def test_assess_columnar_data():
+    blueprint = make_blueprint()
+    columnar = make_blueprint()
+    table = columnar.building_table
+    expected = Assessment(blueprint)
+    assessment = Assessment(columnar)
+    assert columnar.decoded_data.building_table is table
+    assert (assessment.imports, assessment.exports) == (expected.imports, expected.exports)
+    assert assessment.outputs == expected.outputs
+
+def test_assessment_is_complete():
+    assessment = Assessment(make_blueprint())
+    assert (assessment.inputs, assessment.intermediate_inputs, assessment.intermediate_outputs) == ({ dsi.IronOre: 4.0 }, { }, { })
+    assert assessment.primary_output_id == dsi.IronIngot
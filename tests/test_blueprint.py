@@ -0,0 +1,157 @@
+from dspbp.Blueprint import Blueprint
+from dspbp.BlueprintData import BlueprintData
+from dspbp.Enums import DysonSphereItem as dsi, ProliferationEffect
+from tests.synthetic import make_blueprint
+
+def test_round_trip():
+    bp_string = make_blueprint().serialize()
+    bp = Blueprint.from_blueprint_string(bp_string)
+    assert bp.short_desc == 'Synthetic'
+    assert bp.decoded_data.serialize() == bp._data
+
+def test_lazy_blueprint():
+    bp_string = make_blueprint().serialize()
+    bp = Blueprint.from_blueprint_string(bp_string, lazy = True)
+    assert bp.short_desc == 'Synthetic'
+    assert bp._uncompressed_data is None
+    assert bp.serialize() == bp_string
+    assert len(bp.decoded_data.buildings) == len(Blueprint.from_blueprint_string(bp_string).decoded_data.buildings)
+
+def test_decoded_data_is_cached_and_repacked_when_dirty():
+    bp = Blueprint.from_blueprint_string(make_blueprint().serialize())
+    decoded_data = bp.decoded_data
+    assert bp.decoded_data is decoded_data
+    original_data = bp._data
+
+    decoded_data.buildings[1].replace(recipe_id = 3)
+    assert decoded_data.dirty
+    assert bp._data != original_data
+    assert not decoded_data.dirty
+    assert bp.decoded_data is decoded_data
+    assert Blueprint.from_blueprint_string(bp.serialize()).decoded_data.buildings[1].data.recipe_id == 3
+
+    bp._data = original_data
+    assert bp.decoded_data is not decoded_data
+    assert bp.decoded_data.buildings[1].data.recipe_id == 1
+
+def test_columnar_decode():
+    bp_string = make_blueprint().serialize()
+    bp = Blueprint.from_blueprint_string(bp_string, lazy = True)
+    data = bp.decode(columnar = True)
+    assert data._buildings is None
+    assert bp.decoded_data is data
+    assert bp.serialize() == bp_string
+
+    bp = Blueprint.from_blueprint_string(bp_string)
+    bp.decoded_data.buildings[1].replace(recipe_id = 3)
+    data = bp.decode(columnar = True)
+    assert bp.building_table is data.building_table
+    assert data.building_table['recipe_id'][1] == 3
+
+def test_peek_header(tmp_path):
+    bp = make_blueprint(short_desc = 'Peek me')
+    filename = tmp_path / 'peek.txt'
+    bp.write_to_file(filename)
+    header = Blueprint.peek_header(filename, chunk_size = 16)
+    assert header.short_desc == 'Peek me'
+    assert header.long_desc == bp.long_desc
+    assert header.timestamp == bp.timestamp
+    assert header.game_version == bp.game_version
+    assert header.layout == 10
+    assert header.icons == (0, 0, 0, 0, 0)
+
+def test_unmodified_payload_is_passed_through():
+    bp_string = make_blueprint().serialize()
+    bp = Blueprint.from_blueprint_string(bp_string)
+    bp.decoded_data
+    assert bp.serialize() == bp_string
+
+    bp.short_desc = 'Renamed'
+    payload = bp_string.split('"')[1]
+    assert bp.serialize().split('"')[1] == payload
+
+    bp.decoded_data.buildings[1].replace(recipe_id = 3)
+    assert bp.serialize().split('"')[1] != payload
+
+def test_typed_parameters_write_through():
+    bp = Blueprint.from_blueprint_string(make_blueprint().serialize())
+    station, smelter, belt = [ bp.decoded_data.buildings[index] for index in (0, 1, 5) ]
+    assert station.parameters is station.parameters
+
+    station.parameters.set_storage(0, 'item_id', dsi.CopperOre)
+    assert station.parameters.storage[0]['item_id'] == dsi.CopperOre
+    smelter.parameters.set_parameter('proliferation_effect', ProliferationEffect.Speedup)
+    belt.parameters.set_parameter('memo_icon', dsi.CopperIngot)
+    assert bp.decoded_data.dirty
+
+    buildings = Blueprint.from_blueprint_string(bp.serialize()).decoded_data.buildings
+    assert buildings[0].parameters.storage[0]['item_id'] == dsi.CopperOre
+    assert buildings[1].parameters.parameters.proliferation_effect == ProliferationEffect.Speedup
+    assert buildings[5].parameters.parameters.memo_icon == dsi.CopperIngot
+
+def test_lazy_building_index():
+    bp_string = make_blueprint().serialize()
+    bp = Blueprint.from_blueprint_string(bp_string, lazy = True)
+    buildings = bp.decoded_data.buildings
+    assert len(buildings) == 29
+    assert buildings.indices_of([ dsi.PlanetaryLogisticsStation, dsi.ArcSmelter ]) == [ 0, 1, 2, 3, 4 ]
+    assert len(list(buildings.decoded())) == 0
+
+    buildings[2].replace(recipe_id = 3)
+    assert buildings[2] is buildings[2]
+    assert len(list(buildings.decoded())) == 1
+    assert [ building.data.index for building in buildings[-2:] ] == [ 27, 28 ]
+
+    eager_buildings = Blueprint.from_blueprint_string(bp.serialize()).decoded_data.buildings
+    assert [ building.data.recipe_id for building in eager_buildings[1:5] ] == [ 1, 3, 1, 1 ]
+
+def test_iter_buildings_streams_payload():
+    bp_string = make_blueprint(belt_count = 500).serialize()
+    expected = [ building.pack() for building in Blueprint.from_blueprint_string(bp_string).decoded_data.buildings ]
+    bp = Blueprint.from_blueprint_string(bp_string, lazy = True)
+    assert [ building.pack() for building in bp.iter_buildings(chunk_size = 100) ] == expected
+    assert bp._uncompressed_data is None
+    assert [ building.pack() for building in Blueprint.from_blueprint_string(bp_string).iter_buildings() ] == expected
+
+def test_serialize_copies_clean_buildings():
+    data = make_blueprint().decoded_data.serialize()
+    for lazy in [ False, True ]:
+        bpd = BlueprintData.deserialize(data, lazy = lazy)
+        assert bpd.serialize() == data
+        bpd.buildings[3].replace(recipe_id = 3)
+        bpd.buildings[4].parameters.set_parameter('proliferation_effect', ProliferationEffect.Speedup)
+        edited_data = bpd.serialize()
+
+        for building in bpd.buildings:
+            building.mark_dirty()
+        assert bpd.serialize() == edited_data
+        bpd.mark_clean()
+        assert bpd.serialize() == edited_data
+
+def test_lookup_indexes():
+    data = make_blueprint().decoded_data.serialize()
+    for (columnar, lazy) in [ (False, False), (True, False), (False, True) ]:
+        bpd = BlueprintData.deserialize(data, columnar = columnar, lazy = lazy)
+        assert bpd.indices_by('item_id')[dsi.ArcSmelter] == [ 1, 2, 3, 4 ]
+        assert bpd.item_counts[dsi.ConveyorBeltMKIII] == 20
+        assert bpd.item_recipe_counts[(dsi.ArcSmelter, 1)] == 4
+        assert [ building.data.index for building in bpd.buildings_with('item_id', dsi.PlanetaryLogisticsStation, dsi.SorterMKIII) ] == [ 0, 25, 26, 27, 28 ]
+
+        bpd.buildings[2].replace(recipe_id = 3)
+        assert bpd.indices_by('recipe_id')[3] == [ 2 ]
+        assert bpd.item_recipe_counts[(dsi.ArcSmelter, 1)] == 3
+
+def test_lookup_indexes_follow_column_writes():
+    data = make_blueprint().decoded_data.serialize()
+    bpd = BlueprintData.deserialize(data, columnar = True)
+    other = BlueprintData.deserialize(data)
+    index = bpd.indices_by('recipe_id')
+    other.buildings[1].replace(recipe_id = 3)
+    assert bpd.indices_by('recipe_id') is index
+
+    table = bpd.building_table
+    table.assign('recipe_id', 3, where = [ 1 ])
+    assert bpd.indices_by('recipe_id')[3] == [ 1 ]
+    table['recipe_id'][2] = 3
+    bpd.mark_dirty()
+    assert bpd.indices_by('recipe_id')[3] == [ 1, 2 ]
@@ -0,0 +1,59 @@
+import pytest
+
+from dspbp.BlueprintData import BlueprintData
+from dspbp.BuildingTable import BuildingTable
+from dspbp.Enums import DysonSphereItem as dsi, Recipe
+from tests.synthetic import make_blueprint_data
+
+def test_columnar_round_trip():
+    data = make_blueprint_data().serialize()
+    bpd = BlueprintData.deserialize(data, columnar = True)
+    assert len(bpd.building_table) == 29
+    assert bpd.serialize() == data
+    assert BuildingTable.from_buildings(BlueprintData.deserialize(data).buildings).pack() == bpd.building_table.pack()
+
+def test_columnar_conversion():
+    data = make_blueprint_data().serialize()
+    bpd = BlueprintData.deserialize(data, columnar = True)
+    buildings = bpd.buildings
+    assert [ building.raw_parameters for building in buildings ] == [ building.raw_parameters for building in BlueprintData.deserialize(data).buildings ]
+    assert not bpd.dirty
+    assert bpd.serialize() == data
+
+def test_columns():
+    bpd = BlueprintData.deserialize(make_blueprint_data().serialize(), columnar = True)
+    table = bpd.building_table
+    assert table.count("item_id")[dsi.ConveyorBeltMKIII] == 20
+    assert table.count("item_id", "recipe_id")[(dsi.ArcSmelter, Recipe.IronIngot)] == 4
+
+    belts = table.select(table["item_id"] == dsi.ConveyorBeltMKIII)
+    assert len(belts) == 20
+    assert belts.building_parameters(0).tolist() == [ dsi.IronIngot, 5 ]
+
+    table.assign("recipe_id", Recipe.CopperIngot, where = table["item_id"] == dsi.ArcSmelter)
+    assert bpd.dirty
+    buildings = BlueprintData.deserialize(bpd.serialize()).buildings
+    assert [ building.data.recipe_id for building in buildings[1:5] ] == [ Recipe.CopperIngot ] * 4
+
+def test_conversion_keeps_building_edits():
+    bpd = BlueprintData.deserialize(make_blueprint_data().serialize())
+    bpd.buildings[1].replace(recipe_id = Recipe.CopperIngot)
+    assert bpd.building_table["recipe_id"][1] == Recipe.CopperIngot
+    assert bpd.dirty
+    assert BlueprintData.deserialize(bpd.serialize()).buildings[1].data.recipe_id == Recipe.CopperIngot
+
+def test_conversion_detaches_stale_objects():
+    bpd = BlueprintData.deserialize(make_blueprint_data().serialize())
+    building = bpd.buildings[1]
+    table = bpd.building_table
+    with pytest.raises(ValueError):
+        building.replace(recipe_id = 0)
+    with pytest.raises(ValueError):
+        building.parameters.set_parameter('proliferation_effect', 1)
+    assert building.raw_parameters == [ 0 ]
+    assert not bpd.dirty
+
+    bpd.buildings[1].replace(recipe_id = 0)
+    with pytest.raises(ValueError):
+        table.assign("recipe_id", Recipe.CopperIngot)
+    assert BlueprintData.deserialize(bpd.serialize()).buildings[1].data.recipe_id == 0
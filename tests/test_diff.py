@@ -0,0 +1,24 @@
+from dspbp.BlueprintData import BlueprintData
+from dspbp.Diff import BlueprintDiff
+from dspbp.Enums import DysonSphereItem as dsi, Recipe
+from tests.synthetic import make_blueprint_data, make_building
+
+def test_diff():
+    old = make_blueprint_data(belt_count = 20)
+    new = BlueprintData.deserialize(old.serialize())
+    assert BlueprintDiff(old, BlueprintData.deserialize(new.serialize())).identical
+
+    new.buildings[1].replace(recipe_id = Recipe.CopperIngot)
+    new.buildings[0].parameters.set_storage(0, 'max_count', 1000)
+    del new.buildings[10]
+    new.buildings.append(make_building(100, dsi.TeslaTower, 44, 30.0, 10.0))
+    diff = BlueprintDiff(old, new)
+    assert len(diff.unchanged) == 26
+    assert diff.removed == [ 10 ]
+    assert diff.added == [ 28 ]
+    assert [ (change.old, change.new, change.fields, change.parameters_changed) for change in diff.modified ] == [ (0, 0, [ ], True), (1, 1, [ "recipe_id" ], False) ]
+
+    result = diff.to_dict()
+    assert result["summary"] == { "unchanged": 26, "added": 1, "removed": 1, "modified": 2 }
+    assert result["added"] == [ { "index": 100, "item_id": "TeslaTower", "position": [ 30.0, 10.0, 0.0 ] } ]
+    assert result["modified"][1]["fields"] == { "recipe_id": [ Recipe.IronIngot, Recipe.CopperIngot ] }
@@ -0,0 +1,29 @@
+import random
+
+from dspbp import Transform
+from dspbp.BlueprintData import BlueprintData
+from dspbp.Fingerprint import fingerprint
+from tests.synthetic import make_blueprint_data
+
+def test_fingerprint_ignores_order_and_translation():
+    reference = fingerprint(make_blueprint_data(belt_count = 20))
+
+    shuffled = make_blueprint_data(belt_count = 20)
+    # Renumber the buildings in a random order, keeping the connections
+    order = list(range(len(shuffled.buildings)))
+    random.Random(3).shuffle(order)
+    new_index = { building.data.index: order[position] for (position, building) in enumerate(shuffled.buildings) }
+    for building in shuffled.buildings:
+        fields = { "index": new_index[building.data.index] }
+        for field in [ "output_object_index", "input_object_index" ]:
+            if getattr(building.data, field) in new_index:
+                fields[field] = new_index[getattr(building.data, field)]
+        building.replace(**fields)
+    shuffled.buildings.sort(key = lambda building: building.data.index)
+    Transform.translate(shuffled, 3, -2)
+    assert fingerprint(BlueprintData.deserialize(shuffled.serialize())) == reference
+
+    changed = make_blueprint_data(belt_count = 20)
+    changed.buildings[6].replace(output_object_index = 0xffffffff)
+    assert fingerprint(changed) != reference
+    assert fingerprint(make_blueprint_data(belt_count = 19)) != reference
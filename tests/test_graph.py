@@ -0,0 +1,29 @@
+from dspbp.BlueprintData import BlueprintData
+from dspbp.Enums import DysonSphereItem as dsi
+from dspbp.Graph import ConnectivityGraph
+from tests.synthetic import make_blueprint_data
+
+def test_graph():
+    bpd = make_blueprint_data(belt_count = 20)
+    graph = bpd.graph
+    assert graph.node_count == 29
+    # 19 belt links and 4 sorters, each with an input and an output
+    assert graph.edge_count == 19 + 8
+    assert graph.successors(5).tolist() == [ 6, 25 ]
+    assert graph.predecessors(1).tolist() == [ 25 ]
+    assert graph.successors(0).tolist() == [ ]
+
+    labels = graph.connected_components()
+    assert len(set(labels.tolist())) == 2
+    assert labels[0] != labels[1]
+    assert labels[1] == labels[24] == labels[28]
+
+    assert graph.belt_chains() == [ list(range(5, 25)) ]
+    assert not graph.has_cycle()
+
+def test_graph_cycle():
+    bpd = make_blueprint_data(belt_count = 20)
+    bpd.buildings[24].replace(output_object_index = 10)
+    graph = ConnectivityGraph.from_blueprint_data(bpd)
+    assert sorted(graph.find_cycle()) == list(range(10, 25))
+    assert graph.belt_chains() == [ list(range(5, 10)), list(range(10, 25)) ]
@@ -0,0 +1,18 @@
+from dspbp.Enums import DysonSphereItem as dsi
+from dspbp.Recipes import ItemProduction
+
+def test_item_production():
+    outputs = ItemProduction({ dsi.IronIngot: 2.0, dsi.Gear: 1.0 })
+    inputs = ItemProduction({ dsi.IronOre: 2.0 })
+    inputs += { dsi.IronIngot: 1.0 }
+    net = outputs - inputs
+    assert net.items() == [ (dsi.IronIngot, 1.0), (dsi.Gear, 1.0), (dsi.IronOre, -2.0) ]
+    assert outputs.items() == [ (dsi.IronIngot, 2.0), (dsi.Gear, 1.0) ]
+    assert net.primary_output == (dsi.IronIngot, 1.0)
+    assert dsi.IronOre in net and dsi.Steel not in net
+    del net[dsi.IronIngot]
+    assert net.items() == [ (dsi.Gear, 1.0), (dsi.IronOre, -2.0) ]
+    assert str(net) == 'Input:\n    IronOre                     2.0/s | 120.0/min \nOutput:\n    Gear                        1.0/s |  60.0/min '
+
+    total = ItemProduction.total([ outputs, inputs, outputs ])
+    assert total.items() == [ (dsi.IronIngot, 5.0), (dsi.Gear, 2.0), (dsi.IronOre, 2.0) ]
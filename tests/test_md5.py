@@ -0,0 +1,53 @@
+import hashlib
+import io
+import os
+
+from dspbp.MD5 import DysonSphereMD5
+
+VECTORS = {
+    DysonSphereMD5.Variant.MD5F: {
+        b'': '84d1ce3bd68f49ab26eb0f96416617cf',
+        b'a': 'f10bddaecb62e5a92433757867ee06db',
+        b'abcd': 'fa27c78b6ec31559f0e760ce3f2b03f6',
+        b'Why are you doing this, Youthcat Studio?': '13424e12890a3f50a1f8567c464fff8c',
+        bytes(range(256)) * 3: '2b6146176ff9792cc89092f1b0d91562',
+    },
+    DysonSphereMD5.Variant.MD5FC: {
+        b'': 'e58378013a4704d133d4ea095a9dddc1',
+        b'a': '14ae390fd4004bc718af0d9fbe93580f',
+        b'abcd': 'ce5a2034e9ce025661c6dcb4327cd7fd',
+        b'Why are you doing this, Youthcat Studio?': '2aeab7e7e45baad7ce279f8b46769e7a',
+        bytes(range(256)) * 3: '611bbdb1b6e4f8e146d2186a4e6f3dbb',
+    },
+}
+
+def test_original_matches_hashlib():
+    for length in range(200):
+        data = os.urandom(length)
+        assert DysonSphereMD5().update(data).hexdigest() == hashlib.md5(data).hexdigest()
+
+def test_variants():
+    for variant, vectors in VECTORS.items():
+        for data, digest in vectors.items():
+            assert DysonSphereMD5(variant).update(data).hexdigest() == digest
+
+def test_compressor_is_shared_per_variant():
+    assert DysonSphereMD5(DysonSphereMD5.Variant.MD5F)._compress is DysonSphereMD5(DysonSphereMD5.Variant.MD5F)._compress
+    assert DysonSphereMD5(DysonSphereMD5.Variant.MD5F)._compress is not DysonSphereMD5(DysonSphereMD5.Variant.MD5FC)._compress
+
+def test_streaming_update():
+    data = os.urandom(1000)
+    digest = DysonSphereMD5(DysonSphereMD5.Variant.MD5F).update(data).hexdigest()
+    for chunk_size in [1, 7, 63, 64, 65, 200]:
+        md = DysonSphereMD5(DysonSphereMD5.Variant.MD5F)
+        for offset in range(0, len(data), chunk_size):
+            md.update(memoryview(data)[offset : offset + chunk_size])
+        assert md.hexdigest() == digest
+        assert DysonSphereMD5(DysonSphereMD5.Variant.MD5F).update_file(io.BytesIO(data), chunk_size = chunk_size).hexdigest() == digest
+
+def test_hexdigest_many():
+    messages = [ os.urandom(length) for length in [0, 1, 55, 56, 63, 64, 65, 1000, 5000] * 3 ]
+    for variant in DysonSphereMD5.Variant:
+        expected = [ DysonSphereMD5(variant).update(message).hexdigest() for message in messages ]
+        for min_lanes in [1, 8, 100]:
+            assert DysonSphereMD5.hexdigest_many(messages, variant, min_lanes = min_lanes) == expected
@@ -0,0 +1,23 @@
+import numpy
+
+from dspbp.Spatial import SpatialIndex
+from tests.synthetic import make_blueprint_data
+
+def test_spatial_index_matches_brute_force():
+    rng = numpy.random.default_rng(1)
+    (x, y) = (rng.uniform(-50, 150, 2000), rng.uniform(-20, 60, 2000))
+    index = SpatialIndex(x, y, cell_size = 3)
+    for (qx, qy, radius) in [ (0, 0, 5), (100, 30, 17.5), (-60, 0, 15), (500, 500, 1) ]:
+        expected = numpy.flatnonzero(numpy.hypot(x - qx, y - qy) <= radius)
+        assert index.within(qx, qy, radius).tolist() == expected.tolist()
+        expected = numpy.flatnonzero((x >= qx - radius) & (x <= qx + radius) & (y >= qy) & (y <= qy + radius))
+        assert index.in_box(qx - radius, qy, qx + radius, qy + radius).tolist() == expected.tolist()
+        expected = numpy.argsort(numpy.hypot(x - qx, y - qy), kind = "stable")[:5]
+        assert index.nearest(qx, qy, count = 5).tolist() == expected.tolist()
+
+def test_blueprint_spatial_index():
+    bpd = make_blueprint_data(belt_count = 20)
+    index = bpd.spatial_index
+    assert len(index) == 29
+    assert index.nearest(0.2, 0.1).tolist() == [ 0 ]
+    assert index.in_box(0, 2, 19, 2).tolist() == list(range(5, 25))
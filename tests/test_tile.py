@@ -0,0 +1,47 @@
+import pytest
+
+from dspbp import Tile
+from dspbp.BlueprintData import BlueprintData
+from dspbp.Graph import NO_OBJECT
+from dspbp.Enums import DysonSphereItem as dsi
+from tests.synthetic import make_blueprint_data, make_building
+
+def test_tile():
+    bpd = make_blueprint_data(belt_count = 20)
+    assert Tile.default_step(bpd) == (40, 30)
+    tiled = BlueprintData.deserialize(Tile.tile(bpd, 3, 2, 25, 6).serialize())
+    assert tiled.building_count == 6 * 29
+    assert (tiled.areas[0].data.width, tiled.areas[0].data.height) == (40 + 50, 30 + 6)
+    assert tiled.column("index") == list(range(6 * 29))
+    # Last copy: column 2, row 1
+    building = tiled.buildings[(5 * 29) + 5]
+    assert (building.data.local_offset_x, building.data.local_offset_y) == (50.0, 8.0)
+    assert building.data.output_object_index == (5 * 29) + 6
+    assert tiled.buildings[(5 * 29) + 24].data.output_object_index == NO_OBJECT
+    assert len(tiled.graph.belt_chains()) == 6
+    assert tiled.buildings[(5 * 29)].parameters.storage == bpd.buildings[0].parameters.storage
+
+def test_default_step_keeps_copies_apart():
+    bpd = make_blueprint_data()
+    area = bpd.areas[0].data
+    (step_x, step_y) = Tile.default_step(bpd)
+    tiled = Tile.tile(bpd, 2, 2)
+    # Every building stays within its copy of the area, which covers the building footprints
+    for (building_index, (x, y)) in enumerate(zip(tiled.column("local_offset_x"), tiled.column("local_offset_y"))):
+        (row, column) = divmod(building_index // bpd.building_count, 2)
+        left = (column * step_x) - area.anchor_local_offset_x
+        bottom = (row * step_y) - area.anchor_local_offset_y
+        assert (left <= x < left + area.width) and (bottom <= y < bottom + area.height)
+
+def test_tile_single_building():
+    template = make_blueprint_data()
+    area = template.areas[0]
+    area.replace(width = 5, height = 5)
+    bpd = BlueprintData(template.header, [ area ], [ make_building(0, dsi.EnergyExchanger, 0, 0.0, 0.0) ])
+    assert Tile.default_step(bpd) == (5, 5)
+    assert Tile.tile(bpd, 8, 1).column("local_offset_x") == [ 5.0 * i for i in range(8) ]
+
+    area.replace(width = 0)
+    with pytest.raises(ValueError):
+        Tile.tile(bpd, 8, 1)
+    assert Tile.tile(bpd, 8, 1, 5, 0).building_count == 8
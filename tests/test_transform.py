@@ -0,0 +1,38 @@
+import pytest
+
+from dspbp import Transform
+from dspbp.BlueprintData import BlueprintData
+from dspbp.Enums import DysonSphereItem as dsi
+from tests.synthetic import make_blueprint_data
+
+def test_rotate_and_mirror_round_trip():
+    bpd = make_blueprint_data(belt_count = 20)
+    original = bpd.serialize()
+    Transform.rotate(bpd)
+    assert (bpd.column("local_offset_x")[5], bpd.column("local_offset_y")[5]) == (2.0, 0.0)
+    assert bpd.column("yaw")[5] == 180.0
+    area = bpd.areas[0].data
+    assert (area.anchor_local_offset_x, area.anchor_local_offset_y, area.width, area.height) == (5, 35, 30, 40)
+    assert (bpd.header.cursor_offset_x, bpd.header.cursor_offset_y) == (5, 35)
+    Transform.rotate(bpd, 3)
+    assert bpd.serialize() == original
+
+    Transform.mirror(bpd, "y")
+    assert bpd.column("local_offset_y")[5] == -2.0
+    assert bpd.column("yaw")[5] == 90.0
+    assert bpd.areas[0].data.anchor_local_offset_y == 25
+    Transform.mirror(bpd, "y")
+    assert bpd.serialize() == original
+
+def test_translate_and_center():
+    bpd = make_blueprint_data(belt_count = 20)
+    Transform.center_on_poi(bpd, [ dsi.ArcSmelter ])
+    assert (bpd.column("local_offset_x")[1], bpd.column("local_offset_y")[1]) == (0.0, 0.0)
+    assert (bpd.areas[0].data.anchor_local_offset_x, bpd.areas[0].data.anchor_local_offset_y) == (10, 9)
+    reloaded = BlueprintData.deserialize(bpd.serialize())
+    assert reloaded.buildings[5].data.local_offset_x == -5.0
+
+    with pytest.raises(ValueError):
+        Transform.translate(bpd, 20, 0)
+    with pytest.raises(ValueError):
+        Transform.center_on_poi(bpd, [ dsi.TeslaTower ])
@@ -0,0 +1,28 @@
+from dspbp import Transpose
+from dspbp.BlueprintData import BlueprintData
+from dspbp.Enums import DysonSphereItem as dsi, Recipe
+from tests.synthetic import make_blueprint, make_blueprint_data
+
+def test_transpose():
+    bpd = make_blueprint_data(belt_count = 20)
+    bpd.buildings[25].replace(filter_id = dsi.IronIngot)
+    assert Transpose.transpose(bpd, Recipe.IronIngot, Recipe.CopperIngot) == 4 + 1 + 2 + 1
+
+    reloaded = BlueprintData.deserialize(bpd.serialize())
+    assert reloaded.item_recipe_counts[(dsi.ArcSmelter, Recipe.CopperIngot)] == 4
+    assert reloaded.buildings[25].data.filter_id == dsi.CopperIngot
+    storage = reloaded.buildings[0].parameters.storage
+    assert (storage[0]["item_id"], storage[1]["item_id"]) == (dsi.CopperOre, dsi.CopperIngot)
+    assert storage[0]["max_count"] == 5000
+    assert reloaded.buildings[5].parameters.parameters.memo_icon == dsi.CopperIngot
+
+def test_transpose_siblings():
+    assert Recipe.TitaniumIngot in Transpose.sibling_recipes(Recipe.IronIngot)
+    bp = make_blueprint(belt_count = 20)
+    original = bp.serialize()
+    variants = Transpose.transpose_siblings(bp, Recipe.IronIngot, [ Recipe.CopperIngot, Recipe.TitaniumIngot ])
+    assert bp.serialize() == original
+    assert [ recipe for (recipe, _) in variants ] == [ Recipe.CopperIngot, Recipe.TitaniumIngot ]
+    station = variants[1][1].decoded_data.buildings[0]
+    assert station.parameters.storage[0]["item_id"] == dsi.TitaniumOre
+    assert variants[0][1].decoded_data.buildings[0].parameters.storage[0]["item_id"] == dsi.CopperOre
@@ -0,0 +1,32 @@
+from dspbp import Upgrade
+from dspbp.BlueprintData import BlueprintData
+from dspbp.Enums import DysonSphereItem as dsi
+from tests.synthetic import make_blueprint, make_blueprint_data, make_building
+
+def test_set_and_shift_tier():
+    bpd = make_blueprint_data(belt_count = 20)
+    # A smelter stored without parameters gets the production parameter layout
+    bpd.buildings.append(make_building(29, dsi.ArcSmelter, 62, 20.0, 4.0))
+    assert Upgrade.set_tier(bpd, "belt", 1) == 20
+    assert Upgrade.shift_tier(bpd, "smelter", 1) == 5
+    assert Upgrade.shift_tier(bpd, "sorter", 5) == 4
+    assert Upgrade.set_tier(bpd, "assembler", 2) == 0
+
+    reloaded = BlueprintData.deserialize(bpd.serialize())
+    belts = reloaded.buildings_with("item_id", dsi.ConveyorBeltMKI)
+    assert len(belts) == 20 and { building.data.model_index for building in belts } == { 35 }
+    assert belts[0].parameters.parameters.memo_icon == dsi.IronIngot
+    smelters = reloaded.buildings_with("item_id", dsi.PlaneSmelter)
+    assert len(smelters) == 5 and { building.data.model_index for building in smelters } == { 194 }
+    assert [ building.data.parameter_count for building in smelters ] == [ 1 ] * 5
+    assert len(reloaded.buildings_with("item_id", dsi.SorterMKIII)) == 4
+
+def test_template_book():
+    bp = make_blueprint(belt_count = 20, short_desc = "Smelting")
+    original = bp.serialize()
+    book = Upgrade.template_book(bp, [ "belt", "smelter" ])
+    assert [ variant.short_desc for variant in book ] == [ "Smelting MkI", "Smelting MkII", "Smelting MkIII" ]
+    assert bp.serialize() == original
+    assert book[1].decoded_data.item_counts[dsi.ConveyorBeltMKII] == 20
+    assert book[1].decoded_data.item_counts[dsi.PlaneSmelter] == 4
+    assert book[2].decoded_data.item_counts[dsi.PlaneSmelter] == 4